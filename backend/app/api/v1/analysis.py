@@ -1,11 +1,13 @@
 """Face analysis API endpoints."""
 
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, Form, HTTPException, status
 from loguru import logger
 from supabase import Client
 
+from app.dependencies import get_supabase_client, get_validated_image
 from app.models.analysis import (
     AnalysisHistory,
     AnalysisRequest,
@@ -14,6 +16,7 @@ from app.models.analysis import (
 )
 from app.services.analysis_service import get_analysis_service
 from app.utils.exceptions import AnalysisError, FileUploadError, ValidationError
+from app.utils.image_processing import ImageInfo
 
 router = APIRouter()
 
@@ -23,17 +26,9 @@ async def get_current_user_id() -> UUID:
     # Placeholder - implement with Supabase Auth
     return UUID("550e8400-e29b-41d4-a716-446655440000")
 
-# TODO: Add dependency for Supabase client
-async def get_supabase_client() -> Client:
-    """Get Supabase client."""
-    # Placeholder - implement with proper dependency injection
-    from supabase import create_client
-    return create_client("https://placeholder.supabase.co", "placeholder-key")
-
-
 @router.post("/upload", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
 async def analyze_face_image(
-    file: UploadFile = File(...),
+    image: tuple[str, bytes, ImageInfo] = Depends(get_validated_image),
     user_notes: str | None = Form(None),
     analysis_type: str = Form("full"),
     include_report_image: bool = Form(True),
@@ -41,31 +36,11 @@ async def analyze_face_image(
     supabase: Client = Depends(get_supabase_client),
 ) -> AnalysisResponse:
     """Analyze uploaded face image."""
-    try:
-        # Validate file
-        if not file.filename:
-            raise ValidationError("No filename provided", field="filename")
-        
-        if not file.content_type or not file.content_type.startswith("image/"):
-            raise ValidationError(
-                "File must be an image", 
-                field="content_type", 
-                value=file.content_type
-            )
-
-        # Read file data
-        image_data = await file.read()
-        
-        # Validate file size (10MB limit)
-        max_size = 10 * 1024 * 1024  # 10MB
-        if len(image_data) > max_size:
-            raise FileUploadError(
-                f"File too large. Maximum size is {max_size // (1024*1024)}MB",
-                filename=file.filename,
-                file_size=len(image_data),
-            )
+    # Read once and validated by magic bytes in the dependency
+    filename, image_data, info = image
 
-        logger.info(f"🔍 Starting analysis for {file.filename} ({len(image_data)} bytes)")
+    try:
+        logger.info(f"🔍 Starting analysis for {filename} ({len(image_data)} bytes)")
 
         # Get analysis service and perform analysis
         analysis_service = get_analysis_service(supabase)
@@ -73,7 +48,8 @@ async def analyze_face_image(
         result = await analysis_service.analyze_face_image(
             user_id=user_id,
             image_data=image_data,
-            filename=file.filename,
+            filename=filename,
+            mime_type=info.mime,
             user_notes=user_notes,
             analysis_type=analysis_type,
             include_report_image=include_report_image,
@@ -109,7 +85,8 @@ async def get_analysis_result(analysis_id: UUID) -> AnalysisResponse:
 @router.get("/history", response_model=AnalysisHistory)
 async def get_analysis_history(
     limit: int = 10,
-    offset: int = 0,
+    before: datetime | None = None,
+    before_id: UUID | None = None,
 ) -> AnalysisHistory:
     """Get user's analysis history."""
     # TODO: Implement get analysis history
@@ -8,7 +8,7 @@ from loguru import logger
 from app.config import settings
 from app.dependencies import get_supabase_client
 from app.services.linebot_service import get_linebot_service
-from app.utils.exceptions import LineBotError
+from app.utils.exceptions import AuthorizationError, LineBotError
 
 router = APIRouter()
 
@@ -48,6 +48,12 @@ async def line_webhook(
         logger.info("LINE webhook processed successfully")
         return result
         
+    except AuthorizationError as e:
+        logger.error(f"LINE webhook rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        ) from e
     except LineBotError as e:
         logger.error(f"LINE Bot error: {str(e)}")
         raise HTTPException(
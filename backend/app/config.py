@@ -57,6 +57,21 @@ class Settings(BaseSettings):
     supabase_key: str = Field(description="Supabase anon key")
     supabase_service_key: str = Field(description="Supabase service role key")
 
+    # Direct database access (optional, used for hot read paths)
+    database_url: str | None = Field(
+        default=None, description="Postgres connection URL for the asyncpg pool"
+    )
+    database_pool_min_size: int = Field(
+        default=2, description="Minimum asyncpg pool connections"
+    )
+    database_pool_max_size: int = Field(
+        default=10, description="Maximum asyncpg pool connections"
+    )
+    database_statement_cache_size: int = Field(
+        default=100,
+        description="Prepared statement cache size (0 behind a transaction-mode pooler)",
+    )
+
     # OpenAI
     openai_api_key: str = Field(description="OpenAI API key")
     openai_model: str = Field(
@@ -65,6 +80,33 @@ class Settings(BaseSettings):
     openai_max_tokens: int = Field(
         default=1000, description="Max tokens for OpenAI responses"
     )
+    openai_context_window: int = Field(
+        default=128_000, description="Context window of the OpenAI chat model"
+    )
+    openai_embedding_model: str = Field(
+        default="text-embedding-3-small",
+        description="OpenAI model for semantic cache embeddings",
+    )
+    openai_max_concurrency: int = Field(
+        default=32, description="Max concurrent OpenAI chat requests per process"
+    )
+    openai_requests_per_minute: int = Field(
+        default=500, description="OpenAI chat requests allowed per minute"
+    )
+    openai_tokens_per_minute: int = Field(
+        default=200_000, description="OpenAI chat tokens allowed per minute"
+    )
+
+    # Chat semantic cache
+    chat_cache_enabled: bool = Field(
+        default=True, description="Reuse AI responses for near-duplicate questions"
+    )
+    chat_cache_threshold: float = Field(
+        default=0.93, description="Minimum cosine similarity for a cache hit"
+    )
+    chat_cache_ttl: int = Field(
+        default=24 * 60 * 60, description="Semantic cache entry lifetime in seconds"
+    )
 
     # LINE Bot
     line_channel_access_token: str | None = Field(
@@ -89,6 +131,14 @@ class Settings(BaseSettings):
         default=30, description="Analysis timeout in seconds"
     )
     enable_gpu: bool = Field(default=False, description="Enable GPU acceleration")
+    thread_pool_workers: int = Field(
+        default=32,
+        description="Default executor size for blocking SDK calls run via to_thread",
+    )
+    trust_db_results: bool = Field(
+        default=True,
+        description="Skip validation when rebuilding analysis results from the DB",
+    )
 
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
@@ -1,18 +1,16 @@
 """Modern FastAPI integration of the facial beauty analyzer."""
 
 import asyncio
-import tempfile
-from datetime import datetime
-from pathlib import Path
+from datetime import UTC, datetime
 from typing import Any
 
-import cv2
 import mediapipe as mp
 import numpy as np
 from loguru import logger
 
 from app.models.analysis import FaceAnalysisResult
-from app.utils.exceptions import AnalysisError
+from app.utils.exceptions import AnalysisError, ValidationError
+from app.utils.image_processing import ImageProcessor
 
 
 class ModernFacialBeautyAnalyzer:
@@ -94,18 +92,18 @@ class ModernFacialBeautyAnalyzer:
     ) -> FaceAnalysisResult:
         """Synchronous image analysis implementation."""
         try:
-            # Create temporary file for image processing
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                temp_file.write(image_data)
-                temp_path = temp_file.name
-
+            # Decode in memory instead of round-tripping through a temp file
             try:
-                # Process the image
-                result = self._process_image(temp_path, filename)
-                return result
-            finally:
-                # Clean up temporary file
-                Path(temp_path).unlink(missing_ok=True)
+                image_rgb = ImageProcessor.prepare_for_analysis(image_data)
+            except ValidationError as e:
+                raise AnalysisError(
+                    "Could not read image file",
+                    stage="image_loading",
+                    details={"filename": filename},
+                ) from e
+
+            # Process the image
+            return self._process_image(image_rgb, filename)
 
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}")
@@ -115,19 +113,11 @@ class ModernFacialBeautyAnalyzer:
                 details={"filename": filename},
             ) from e
 
-    def _process_image(self, image_path: str, filename: str) -> FaceAnalysisResult:
-        """Process image and extract facial analysis results."""
-        # Read image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise AnalysisError(
-                "Could not read image file",
-                stage="image_loading",
-                details={"path": image_path},
-            )
-
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        h, w, _ = image.shape
+    def _process_image(
+        self, image_rgb: np.ndarray, filename: str
+    ) -> FaceAnalysisResult:
+        """Process an RGB image and extract facial analysis results."""
+        h, w, _ = image_rgb.shape
 
         # Analyze with MediaPipe
         with self.mp_face_mesh.FaceMesh(
@@ -194,7 +184,7 @@ class ModernFacialBeautyAnalyzer:
 
             # Create result object
             result = FaceAnalysisResult(
-                timestamp=datetime.now(),
+                timestamp=datetime.now(UTC),
                 image_info={
                     "filename": filename,
                     "dimensions": f"{w}x{h}",
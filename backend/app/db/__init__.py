@@ -0,0 +1,11 @@
+"""Direct database access for Face Aesthetic API."""
+
+from .pool import acquire_as_user, close_pool, get_pool, init_pool, record_to_dict
+
+__all__ = [
+    "acquire_as_user",
+    "close_pool",
+    "get_pool",
+    "init_pool",
+    "record_to_dict",
+]
@@ -0,0 +1,96 @@
+"""asyncpg connection pool for hot read paths that bypass PostgREST."""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+
+import asyncpg
+import orjson
+from loguru import logger
+
+from app.config import settings
+
+# Shared pool, created during application startup
+_pool: asyncpg.Pool | None = None
+
+
+async def init_pool() -> asyncpg.Pool | None:
+    """Create the shared connection pool if a database URL is configured."""
+    global _pool
+
+    if _pool is None and settings.database_url:
+        _pool = await asyncpg.create_pool(
+            settings.database_url,
+            min_size=settings.database_pool_min_size,
+            max_size=settings.database_pool_max_size,
+            statement_cache_size=settings.database_statement_cache_size,
+            init=_init_connection,
+        )
+        logger.info("🗄️ Database connection pool initialized")
+
+    return _pool
+
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    """Encode and decode JSON columns with orjson on every new connection."""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=_encode_json,
+            decoder=orjson.loads,
+            schema="pg_catalog",
+        )
+
+
+def _encode_json(value: Any) -> str:
+    """Serialize a JSON parameter for asyncpg's text codec."""
+    return orjson.dumps(value).decode()
+
+
+def get_pool() -> asyncpg.Pool | None:
+    """Get the shared connection pool, or None when it is not configured."""
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared connection pool."""
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def acquire_as_user(user_id: UUID) -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a connection whose transaction runs as the given user.
+
+    The role and JWT claims are set the same way PostgREST sets them, so
+    ``auth.uid()`` and the RLS policies still apply to every query.
+    """
+    if _pool is None:
+        raise RuntimeError("Database connection pool is not initialized")
+
+    claims = orjson.dumps({"sub": str(user_id), "role": "authenticated"}).decode()
+
+    async with _pool.acquire() as connection, connection.transaction():
+        await connection.execute(
+            "SELECT set_config('request.jwt.claims', $1, true), "
+            "set_config('role', 'authenticated', true)",
+            claims,
+        )
+        yield connection
+
+
+def record_to_dict(record: asyncpg.Record) -> dict[str, Any]:
+    """Convert a record to the JSON-shaped dict PostgREST would return."""
+    row: dict[str, Any] = {}
+    for key, value in record.items():
+        if isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        row[key] = value
+    return row
@@ -0,0 +1,81 @@
+"""Shared FastAPI dependencies."""
+
+from functools import lru_cache
+
+import httpx
+from fastapi import File, HTTPException, UploadFile, status
+from supabase import Client, create_client
+
+from app.config import settings
+from app.utils.exceptions import FileUploadError, ValidationError
+from app.utils.image_processing import ImageInfo, ImageProcessor
+from app.utils.validators import ImageValidator
+
+
+@lru_cache(maxsize=1)
+def get_supabase_client() -> Client:
+    """Get the shared Supabase client (created once, reused across requests)."""
+    client = create_client(settings.supabase_url, settings.supabase_service_key)
+
+    # Swap in a PostgREST session with an explicit keep-alive pool so bursts
+    # reuse warm HTTP/2 connections instead of paying new TLS handshakes
+    session = client.postgrest.session
+    client.postgrest.session = type(session)(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=httpx.Timeout(10.0, connect=2.0),
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0
+        ),
+    )
+    session.close()
+    return client
+
+
+async def get_validated_image(
+    file: UploadFile = File(...),
+) -> tuple[str, bytes, ImageInfo]:
+    """Read an uploaded image once and validate it by its magic bytes.
+
+    Returns the filename, the raw bytes and the probed image header; the
+    client's claimed content type is never trusted.
+    """
+    try:
+        if not file.filename:
+            raise ValidationError("No filename provided", field="filename")
+
+        # Read at most one byte past the limit so oversized bodies stop early
+        image_data = await file.read(settings.max_file_size + 1)
+        if len(image_data) > settings.max_file_size:
+            raise FileUploadError(
+                f"File too large. Maximum size is {settings.max_file_size // (1024*1024)}MB",
+                filename=file.filename,
+                file_size=len(image_data),
+            )
+
+        try:
+            info = ImageProcessor.probe(image_data)
+        except ValidationError as e:
+            raise ValidationError(
+                "File must be an image",
+                field="content_type",
+                value=file.content_type,
+            ) from e
+
+        # Only JPEG, PNG and WebP are accepted, whatever the PIL fallback can read
+        if info.mime is None:
+            raise ValidationError(
+                f"Unsupported image format: {info.format}",
+                field="content_type",
+                value=info.format,
+            )
+
+        ImageValidator.validate_upload(file.filename, info.mime, len(image_data), info)
+        return file.filename, image_data, info
+
+    except (ValidationError, FileUploadError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
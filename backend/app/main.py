@@ -1,8 +1,10 @@
 """Main FastAPI application with modern Python practices."""
 
+import asyncio
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -16,7 +18,13 @@ from loguru import logger
 
 from app.api.v1 import analysis, auth, chat, linebot
 from app.config import settings
+from app.db import close_pool, init_pool
+from app.services.analysis_service import drain_background_tasks
+from app.services.chatbot_service import load_tokenizer
+from app.services.linebot_service import close_linebot_clients
+from app.services.storage_service import close_storage_clients
 from app.utils.exceptions import setup_exception_handlers
+from app.utils.write_queue import flush_write_queues
 
 
 @asynccontextmanager
@@ -32,6 +40,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     os.makedirs(settings.upload_path, exist_ok=True)
     logger.info(f"Upload directory: {settings.upload_path}")
 
+    # Room for blocking Supabase SDK calls offloaded with asyncio.to_thread
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.thread_pool_workers)
+    )
+
+    # Direct database pool for hot read paths (optional)
+    await init_pool()
+
+    # Fetch the chat tokenizer now rather than on the first chat request
+    await load_tokenizer()
+
     # Log configuration
     if settings.debug:
         logger.info("🔧 Debug mode enabled - detailed logging active")
@@ -40,6 +59,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     logger.info("🛑 Shutting down Face Aesthetic API")
+    await drain_background_tasks()
+    await flush_write_queues()
+    await close_linebot_clients()
+    await close_storage_clients()
+    await close_pool()
 
 
 def create_application() -> FastAPI:
@@ -210,6 +210,22 @@ class AnalysisResponse(BaseModel):
     processing_time: float = Field(description="Processing time in seconds")
 
 
+class AnalysisSummary(BaseModel):
+    """Lightweight analysis record for history listings."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(description="Analysis unique identifier")
+    user_id: UUID = Field(description="User who requested analysis")
+    created_at: datetime = Field(description="Analysis creation timestamp")
+    image_url: str = Field(description="Original image URL")
+    report_image_url: str | None = Field(
+        default=None, description="Generated report image URL"
+    )
+    overall_score: OverallScore = Field(description="Overall assessment")
+    processing_time: float = Field(description="Processing time in seconds")
+
+
 class AnalysisHistory(BaseModel):
     """User's analysis history summary."""
 
@@ -0,0 +1 @@
+"""Database schemas for Face Aesthetic API."""
@@ -1,16 +1,88 @@
 """Analysis service for handling face analysis operations."""
 
 import asyncio
-from datetime import datetime
+import functools
+import time
+from collections.abc import Coroutine
+from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID, uuid4
 
+import orjson
 from loguru import logger
 from supabase import Client
 
+from app.config import settings
 from app.core.facial_analyzer import get_facial_analyzer
-from app.models.analysis import AnalysisResponse, FaceAnalysisResult
+from app.db import acquire_as_user, get_pool, record_to_dict
+from app.models.analysis import (
+    AnalysisResponse,
+    AnalysisSummary,
+    DentalProtrusion,
+    ElineAnalysis,
+    FaceAnalysisResult,
+    FaceAngle,
+    FaceContour,
+    FaceProportions,
+    FacialHarmony,
+    NasolabialAngle,
+    OverallScore,
+    PhiltrumChinRatio,
+    SymmetryAnalysis,
+    VlineAnalysis,
+)
 from app.services.storage_service import get_storage_service
-from app.utils.exceptions import AnalysisError, DatabaseError
+from app.utils.exceptions import AnalysisError, DatabaseError, ValidationError
+from app.utils.image_processing import ImageProcessor
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+# Seconds to let pending result writes finish on shutdown
+_SHUTDOWN_DRAIN_TIMEOUT = 30
+
+
+def _run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
+    """Schedule a coroutine without awaiting it, logging any failure."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
+def _on_background_task_done(task: asyncio.Task[Any]) -> None:
+    """Release a finished background task and log its failure, if any."""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task failed: {task.exception()}")
+
+
+async def drain_background_tasks(timeout: float = _SHUTDOWN_DRAIN_TIMEOUT) -> None:
+    """Wait up to ``timeout`` seconds for pending result writes (call on shutdown)."""
+    if _background_tasks:
+        _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+        if pending:
+            logger.warning(f"{len(pending)} analysis writes still pending at shutdown")
+
+
+async def _run_stage[T](stage: str, coro: Coroutine[Any, Any, T]) -> T:
+    """Await one pipeline step, tagging any failure with its stage."""
+    try:
+        return await coro
+    except Exception as e:
+        raise AnalysisError(f"{stage} failed: {str(e)}", stage=stage) from e
+
+
+def _before_cursor[Q](query: Q, before: tuple[datetime, UUID] | None) -> Q:
+    """Filter a PostgREST query to rows before a ``(created_at, id)`` cursor."""
+    if before is None:
+        return query
+    # PostgREST has no row comparison; spell (created_at, id) < cursor out
+    before_at, before_id = before
+    at = before_at.isoformat()
+    return query.or_(
+        f'created_at.lt."{at}",and(created_at.eq."{at}",id.lt.{before_id})'
+    )
 
 
 class AnalysisService:
@@ -30,26 +102,50 @@ class AnalysisService:
         user_notes: str | None = None,
         analysis_type: str = "full",
         include_report_image: bool = True,
+        mime_type: str | None = None,
     ) -> AnalysisResponse:
         """Analyze face image and store results."""
         analysis_id = uuid4()
-        start_time = datetime.now()
+        analysis_id_str = str(analysis_id)
+        user_id_str = str(user_id)
+        start_perf = time.perf_counter()
+        if mime_type is None:
+            try:
+                mime_type = ImageProcessor.probe(image_data).mime
+            except ValidationError:
+                pass
+        mime_type = mime_type or "application/octet-stream"
 
         try:
-            logger.info(f"🔍 Starting analysis {analysis_id} for user {user_id}")
-
-            # Step 1: Upload original image to storage
-            image_url = await self.storage_service.upload_image(
-                user_id=user_id,
-                image_data=image_data,
-                filename=filename,
-                image_type="analysis",
-            )
-
-            # Step 2: Perform facial analysis
-            analysis_result = await self.analyzer.analyze_image_async(
-                image_data=image_data, filename=filename
-            )
+            logger.info(f"🔍 Starting analysis {analysis_id_str} for user {user_id_str}")
+
+            # Step 1-2: Upload original image and perform facial analysis
+            # concurrently (the analyzer only needs the raw bytes)
+            upload_task = asyncio.create_task(_run_stage(
+                "upload",
+                self.storage_service.upload_image(
+                    user_id=user_id,
+                    image_data=image_data,
+                    filename=filename,
+                    image_type="analysis",
+                    mime_type=mime_type,
+                ),
+            ))
+            analyze_task = asyncio.create_task(_run_stage(
+                "analyze",
+                self.analyzer.analyze_image_async(
+                    image_data=image_data, filename=filename
+                ),
+            ))
+            try:
+                image_url, analysis_result = await asyncio.gather(
+                    upload_task, analyze_task
+                )
+            except BaseException:
+                # Don't leave the sibling running when one side fails
+                upload_task.cancel()
+                analyze_task.cancel()
+                raise
 
             # Step 3: Generate report image if requested
             report_image_url = None
@@ -59,12 +155,14 @@ class AnalysisService:
                 pass
 
             # Step 4: Calculate processing time
-            processing_time = (datetime.now() - start_time).total_seconds()
-
-            # Step 5: Store analysis results in database
-            analysis_record = await self._store_analysis_result(
-                analysis_id=analysis_id,
-                user_id=user_id,
+            processing_time = time.perf_counter() - start_perf
+
+            # Step 5: Store analysis results in database without blocking
+            # the response; the row is written with the same created_at
+            created_at = datetime.now(UTC)
+            _run_in_background(self._store_analysis_result(
+                analysis_id_str=analysis_id_str,
+                user_id_str=user_id_str,
                 image_url=image_url,
                 report_image_url=report_image_url,
                 analysis_result=analysis_result,
@@ -73,14 +171,16 @@ class AnalysisService:
                 analysis_type=analysis_type,
                 filename=filename,
                 image_size=len(image_data),
-            )
+                image_mime_type=mime_type,
+                created_at=created_at,
+            ))
 
-            logger.info(f"✅ Analysis {analysis_id} completed successfully")
+            logger.info(f"✅ Analysis {analysis_id_str} completed successfully")
 
             return AnalysisResponse(
                 id=analysis_id,
                 user_id=user_id,
-                created_at=analysis_record["created_at"],
+                created_at=created_at,
                 image_url=image_url,
                 report_image_url=report_image_url,
                 result=analysis_result,
@@ -89,20 +189,27 @@ class AnalysisService:
             )
 
         except Exception as e:
-            logger.error(f"❌ Analysis {analysis_id} failed: {str(e)}")
-            
-            # Store failure record
-            await self._store_analysis_failure(
-                analysis_id=analysis_id,
-                user_id=user_id,
-                error=str(e),
-                processing_time=(datetime.now() - start_time).total_seconds(),
+            stage = (
+                e.details.get("analysis_stage")
+                if isinstance(e, AnalysisError)
+                else None
             )
+            logger.error(f"❌ Analysis {analysis_id_str} failed at {stage}: {str(e)}")
+
+            # Only analyzer failures are worth a failure record; upload
+            # failures are usually transient and would just add DB writes
+            if stage == "analyze":
+                await self._store_analysis_failure(
+                    analysis_id_str=analysis_id_str,
+                    user_id_str=user_id_str,
+                    error=str(e),
+                    processing_time=time.perf_counter() - start_perf,
+                )
 
             raise AnalysisError(
                 f"Face analysis failed: {str(e)}",
-                stage="analysis_service",
-                details={"analysis_id": str(analysis_id)},
+                stage=stage or "analysis_service",
+                details={"analysis_id": analysis_id_str},
             ) from e
 
     async def get_analysis_result(
@@ -110,30 +217,21 @@ class AnalysisService:
     ) -> AnalysisResponse:
         """Get stored analysis result."""
         try:
-            response = (
-                self.supabase.table("analysis_results")
-                .select("*")
-                .eq("id", str(analysis_id))
-                .eq("user_id", str(user_id))
-                .single()
-                .execute()
-            )
+            data = await self._fetch_analysis_row(analysis_id, user_id)
 
-            if not response.data:
+            if not data:
                 raise AnalysisError(
                     "Analysis result not found",
                     stage="database_query",
                     details={"analysis_id": str(analysis_id)},
                 )
 
-            data = response.data
-            
             # Reconstruct FaceAnalysisResult from stored JSON
             analysis_result = self._reconstruct_analysis_result(data)
 
             return AnalysisResponse(
-                id=UUID(data["id"]),
-                user_id=UUID(data["user_id"]),
+                id=analysis_id,
+                user_id=user_id,
                 created_at=datetime.fromisoformat(data["created_at"]),
                 image_url=data["original_image_url"],
                 report_image_url=data.get("report_image_url"),
@@ -150,35 +248,24 @@ class AnalysisService:
             ) from e
 
     async def get_user_analysis_history(
-        self, user_id: UUID, limit: int = 10, offset: int = 0
+        self,
+        user_id: UUID,
+        limit: int = 10,
+        before: tuple[datetime, UUID] | None = None,
     ) -> list[AnalysisResponse]:
-        """Get user's analysis history."""
+        """Get user's analysis history, newest first.
+
+        ``before`` is the ``(created_at, id)`` of the last row already seen;
+        the id breaks ties between rows created in the same instant.
+        """
         try:
-            response = (
-                self.supabase.table("analysis_results")
-                .select("*")
-                .eq("user_id", str(user_id))
-                .order("created_at", desc=True)
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
+            rows = await self._fetch_history_rows(user_id, limit, before)
 
-            results = []
-            for data in response.data:
-                analysis_result = self._reconstruct_analysis_result(data)
-                
-                results.append(
-                    AnalysisResponse(
-                        id=UUID(data["id"]),
-                        user_id=UUID(data["user_id"]),
-                        created_at=datetime.fromisoformat(data["created_at"]),
-                        image_url=data["original_image_url"],
-                        report_image_url=data.get("report_image_url"),
-                        result=analysis_result,
-                        status="completed",
-                        processing_time=data.get("processing_time_seconds", 0.0),
-                    )
-                )
+            # Large pages are CPU-bound to rebuild; keep them off the event loop
+            if len(rows) > _INLINE_HISTORY_LIMIT:
+                results = await asyncio.to_thread(self._build_history, rows)
+            else:
+                results = self._build_history(rows)
 
             return results
 
@@ -189,42 +276,88 @@ class AnalysisService:
                 operation="get_analysis_history",
             ) from e
 
+    async def get_user_analysis_summaries(
+        self,
+        user_id: UUID,
+        limit: int = 10,
+        before: tuple[datetime, UUID] | None = None,
+    ) -> list[AnalysisSummary]:
+        """Get user's analysis history as lightweight summaries, newest first.
+
+        ``before`` is the same ``(created_at, id)`` cursor as for the history.
+        """
+        try:
+            query = _before_cursor(
+                self.supabase.table("analysis_results")
+                .select(_SUMMARY_COLUMNS)
+                .eq("user_id", str(user_id)),
+                before,
+            )
+            response = await asyncio.to_thread(
+                query.order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit)
+                .execute
+            )
+
+            return [
+                AnalysisSummary(
+                    id=UUID(data["id"]),
+                    user_id=UUID(data["user_id"]),
+                    created_at=datetime.fromisoformat(data["created_at"]),
+                    image_url=data["original_image_url"],
+                    report_image_url=data.get("report_image_url"),
+                    overall_score=data["overall_score"],
+                    processing_time=data.get("processing_time_seconds") or 0.0,
+                )
+                for data in response.data
+            ]
+
+        except Exception as e:
+            logger.error(f"Failed to get analysis summaries: {str(e)}")
+            raise DatabaseError(
+                f"Failed to retrieve analysis summaries: {str(e)}",
+                operation="get_analysis_summaries",
+            ) from e
+
     async def delete_analysis_result(
         self, analysis_id: UUID, user_id: UUID
     ) -> None:
         """Delete analysis result and associated images."""
+        analysis_id_str = str(analysis_id)
+
         try:
-            # Get analysis data first
-            response = (
-                self.supabase.table("analysis_results")
-                .select("original_image_url, report_image_url")
-                .eq("id", str(analysis_id))
-                .eq("user_id", str(user_id))
-                .single()
-                .execute()
+            # Delete the row and get its image URLs back in one round-trip
+            response = await asyncio.to_thread(
+                self.supabase.rpc(
+                    "delete_analysis_returning",
+                    {"p_id": analysis_id_str, "p_user": str(user_id)},
+                ).execute
             )
 
             if not response.data:
                 raise AnalysisError(
                     "Analysis result not found",
                     stage="database_query",
-                    details={"analysis_id": str(analysis_id)},
+                    details={"analysis_id": analysis_id_str},
                 )
 
-            # Delete from database
-            self.supabase.table("analysis_results").delete().eq(
-                "id", str(analysis_id)
-            ).eq("user_id", str(user_id)).execute()
-
-            # Delete associated images
-            data = response.data
-            if data.get("original_image_url"):
-                await self.storage_service.delete_image_by_url(data["original_image_url"])
-            
-            if data.get("report_image_url"):
-                await self.storage_service.delete_image_by_url(data["report_image_url"])
+            # Delete associated images concurrently (best-effort)
+            data = response.data[0]
+            image_urls = [
+                url
+                for url in (data.get("original_image_url"), data.get("report_image_url"))
+                if url
+            ]
+            results = await asyncio.gather(
+                *(self.storage_service.delete_image_by_url(url) for url in image_urls),
+                return_exceptions=True,
+            )
+            for url, result in zip(image_urls, results, strict=True):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Failed to delete image {url}: {str(result)}")
 
-            logger.info(f"🗑️ Deleted analysis {analysis_id}")
+            logger.info(f"🗑️ Deleted analysis {analysis_id_str}")
 
         except Exception as e:
             logger.error(f"Failed to delete analysis result: {str(e)}")
@@ -235,8 +368,8 @@ class AnalysisService:
 
     async def _store_analysis_result(
         self,
-        analysis_id: UUID,
-        user_id: UUID,
+        analysis_id_str: str,
+        user_id_str: str,
         image_url: str,
         report_image_url: str | None,
         analysis_result: FaceAnalysisResult,
@@ -245,47 +378,53 @@ class AnalysisService:
         analysis_type: str,
         filename: str,
         image_size: int,
-    ) -> dict:
-        """Store analysis result in database."""
+        image_mime_type: str,
+        created_at: datetime | None = None,
+    ) -> datetime:
+        """Store analysis result in database and return its creation time."""
         try:
-            # Convert analysis result to JSON format
+            # Convert analysis result to JSON format in a single pass
+            dumped = analysis_result.model_dump(
+                mode="json",
+                exclude={"timestamp", "image_info", "beauty_advice", "angle_warning"},
+            )
             analysis_data = {
-                "id": str(analysis_id),
-                "user_id": str(user_id),
+                "id": analysis_id_str,
+                "user_id": user_id_str,
                 "original_image_url": image_url,
                 "original_filename": filename,
                 "image_size_bytes": image_size,
-                "image_mime_type": "image/jpeg",  # TODO: Detect actual MIME type
+                "image_mime_type": image_mime_type,
                 "image_dimensions": analysis_result.image_info.get("dimensions"),
                 "analysis_type": analysis_type,
                 "processing_time_seconds": processing_time,
                 "user_notes": user_notes,
-                "face_angle": analysis_result.face_angle.model_dump(),
-                "face_contour": analysis_result.face_contour.model_dump(),
-                "eline_analysis": analysis_result.eline.model_dump(),
-                "face_proportions": analysis_result.proportions.model_dump(),
-                "philtrum_chin_ratio": analysis_result.philtrum_chin.model_dump(),
-                "nasolabial_angle": analysis_result.nasolabial_angle.model_dump(),
-                "vline_analysis": analysis_result.vline.model_dump(),
-                "symmetry_analysis": analysis_result.symmetry.model_dump(),
-                "dental_protrusion": analysis_result.dental_protrusion.model_dump(),
-                "facial_harmony": analysis_result.facial_harmony.model_dump(),
-                "overall_score": analysis_result.overall_score.model_dump(),
+                "face_angle": dumped["face_angle"],
+                "face_contour": dumped["face_contour"],
+                "eline_analysis": dumped["eline"],
+                "face_proportions": dumped["proportions"],
+                "philtrum_chin_ratio": dumped["philtrum_chin"],
+                "nasolabial_angle": dumped["nasolabial_angle"],
+                "vline_analysis": dumped["vline"],
+                "symmetry_analysis": dumped["symmetry"],
+                "dental_protrusion": dumped["dental_protrusion"],
+                "facial_harmony": dumped["facial_harmony"],
+                "overall_score": dumped["overall_score"],
                 "beauty_advice": analysis_result.beauty_advice,
                 "report_image_url": report_image_url,
                 "report_generated": report_image_url is not None,
                 "face_detection_confidence": 0.95,  # TODO: Extract from actual analysis
                 "analysis_warnings": [],
                 "angle_warning": analysis_result.angle_warning,
+                "created_at": created_at.isoformat() if created_at else None,
             }
 
-            response = (
-                self.supabase.table("analysis_results")
-                .insert(analysis_data)
-                .execute()
+            # The Supabase client is synchronous; keep the write off the event loop
+            response = await asyncio.to_thread(
+                self.supabase.rpc("store_analysis", {"payload": analysis_data}).execute
             )
 
-            return response.data[0]
+            return datetime.fromisoformat(response.data)
 
         except Exception as e:
             logger.error(f"Failed to store analysis result: {str(e)}")
@@ -296,75 +435,246 @@ class AnalysisService:
 
     async def _store_analysis_failure(
         self,
-        analysis_id: UUID,
-        user_id: UUID,
+        analysis_id_str: str,
+        user_id_str: str,
         error: str,
         processing_time: float,
     ) -> None:
         """Store analysis failure for debugging."""
         try:
+            error_detail = {"error": error}
             failure_data = {
-                "id": str(analysis_id),
-                "user_id": str(user_id),
-                "original_image_url": "",
-                "original_filename": "failed_analysis",
-                "image_size_bytes": 0,
-                "image_mime_type": "",
-                "analysis_type": "failed",
+                **_FAILURE_TEMPLATE,
+                **dict.fromkeys(_FAILURE_FIELD_KEYS, error_detail),
+                "id": analysis_id_str,
+                "user_id": user_id_str,
                 "processing_time_seconds": processing_time,
-                "face_angle": {"error": error},
-                "face_contour": {"error": error},
-                "eline_analysis": {"error": error},
-                "face_proportions": {"error": error},
-                "philtrum_chin_ratio": {"error": error},
-                "nasolabial_angle": {"error": error},
-                "vline_analysis": {"error": error},
-                "symmetry_analysis": {"error": error},
-                "dental_protrusion": {"error": error},
-                "facial_harmony": {"error": error},
                 "overall_score": {"error": error, "score": 0},
                 "beauty_advice": [f"分析エラー: {error}"],
                 "analysis_warnings": [error],
             }
 
-            self.supabase.table("analysis_results").insert(failure_data).execute()
+            await asyncio.to_thread(
+                self.supabase.rpc("store_analysis", {"payload": failure_data}).execute
+            )
 
         except Exception as e:
             logger.error(f"Failed to store analysis failure: {str(e)}")
             # Don't raise here to avoid masking original error
 
+    async def _fetch_analysis_row(
+        self, analysis_id: UUID, user_id: UUID
+    ) -> dict | None:
+        """Fetch one analysis row, preferring the direct database pool."""
+        if get_pool() is not None:
+            async with acquire_as_user(user_id) as connection:
+                record = await connection.fetchrow(
+                    "SELECT * FROM public.analysis_results "
+                    "WHERE id = $1 AND user_id = $2",
+                    analysis_id,
+                    user_id,
+                )
+            return record_to_dict(record) if record else None
+
+        response = await asyncio.to_thread(
+            self.supabase.table("analysis_results")
+            .select("*")
+            .eq("id", str(analysis_id))
+            .eq("user_id", str(user_id))
+            .single()
+            .execute
+        )
+        return response.data
+
+    async def _fetch_history_rows(
+        self, user_id: UUID, limit: int, before: tuple[datetime, UUID] | None
+    ) -> list[dict]:
+        """Fetch a keyset page of analysis rows, preferring the direct pool."""
+        before_at, before_id = before if before is not None else (None, None)
+
+        if get_pool() is not None:
+            async with acquire_as_user(user_id) as connection:
+                records = await connection.fetch(
+                    "SELECT * FROM public.analysis_results WHERE user_id = $1 "
+                    "AND ($2::timestamptz IS NULL "
+                    "OR (created_at, id) < ($2, $3::uuid)) "
+                    "ORDER BY created_at DESC, id DESC LIMIT $4",
+                    user_id,
+                    before_at,
+                    before_id,
+                    limit,
+                )
+            return [record_to_dict(record) for record in records]
+
+        query = _before_cursor(
+            self.supabase.table("analysis_results")
+            .select("*")
+            .eq("user_id", str(user_id)),
+            before,
+        )
+        response = await asyncio.to_thread(
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute
+        )
+        return response.data
+
+    def _build_history(self, rows: list[dict]) -> list[AnalysisResponse]:
+        """Build analysis responses from stored history rows."""
+        return [
+            AnalysisResponse(
+                id=UUID(data["id"]),
+                user_id=UUID(data["user_id"]),
+                created_at=datetime.fromisoformat(data["created_at"]),
+                image_url=data["original_image_url"],
+                report_image_url=data.get("report_image_url"),
+                result=self._reconstruct_analysis_result(data),
+                status="completed",
+                processing_time=data.get("processing_time_seconds", 0.0),
+            )
+            for data in rows
+        ]
+
     def _reconstruct_analysis_result(self, data: dict) -> FaceAnalysisResult:
         """Reconstruct FaceAnalysisResult from database JSON."""
+        payload = {}
+        for key in _RESULT_COLUMNS:
+            if key not in data:
+                continue
+            value = data[key]
+            if key in _JSONB_COLUMNS and isinstance(value, str):
+                value = orjson.loads(value)
+            payload[key] = value
+        return _reconstruct_cached(
+            str(data["id"]),
+            str(data.get("updated_at")),
+            orjson.dumps(payload, option=orjson.OPT_SORT_KEYS),
+        )
+
+
+# Constant columns of a failure record
+_FAILURE_TEMPLATE: dict[str, Any] = {
+    "original_image_url": "",
+    "original_filename": "failed_analysis",
+    "image_size_bytes": 0,
+    "image_mime_type": "",
+    "analysis_type": "failed",
+}
+
+# Result columns that hold the error detail in a failure record
+_FAILURE_FIELD_KEYS = (
+    "face_angle",
+    "face_contour",
+    "eline_analysis",
+    "face_proportions",
+    "philtrum_chin_ratio",
+    "nasolabial_angle",
+    "vline_analysis",
+    "symmetry_analysis",
+    "dental_protrusion",
+    "facial_harmony",
+)
+
+# History pages larger than this are rebuilt in a worker thread
+_INLINE_HISTORY_LIMIT = 50
+
+# Row columns needed for history summaries (skips the large JSONB results)
+_SUMMARY_COLUMNS = (
+    "id,user_id,created_at,original_image_url,report_image_url,"
+    "overall_score,processing_time_seconds"
+)
+
+# Row columns that feed into a reconstructed FaceAnalysisResult
+_RESULT_COLUMNS = (
+    "created_at",
+    "original_filename",
+    "image_dimensions",
+    "face_angle",
+    "face_contour",
+    "eline_analysis",
+    "face_proportions",
+    "philtrum_chin_ratio",
+    "nasolabial_angle",
+    "vline_analysis",
+    "symmetry_analysis",
+    "dental_protrusion",
+    "facial_harmony",
+    "overall_score",
+    "beauty_advice",
+    "angle_warning",
+)
+
+# JSONB columns that some clients hand back as undecoded strings
+_JSONB_COLUMNS = frozenset({
+    "face_angle",
+    "face_contour",
+    "eline_analysis",
+    "face_proportions",
+    "philtrum_chin_ratio",
+    "nasolabial_angle",
+    "vline_analysis",
+    "symmetry_analysis",
+    "dental_protrusion",
+    "facial_harmony",
+    "overall_score",
+    "beauty_advice",
+})
+
+# Result field -> (sub-model, row column) for FaceAnalysisResult reconstruction
+_RESULT_SUBMODELS: dict[str, tuple[type, str]] = {
+    "face_angle": (FaceAngle, "face_angle"),
+    "face_contour": (FaceContour, "face_contour"),
+    "eline": (ElineAnalysis, "eline_analysis"),
+    "proportions": (FaceProportions, "face_proportions"),
+    "philtrum_chin": (PhiltrumChinRatio, "philtrum_chin_ratio"),
+    "nasolabial_angle": (NasolabialAngle, "nasolabial_angle"),
+    "vline": (VlineAnalysis, "vline_analysis"),
+    "symmetry": (SymmetryAnalysis, "symmetry_analysis"),
+    "dental_protrusion": (DentalProtrusion, "dental_protrusion"),
+    "facial_harmony": (FacialHarmony, "facial_harmony"),
+    "overall_score": (OverallScore, "overall_score"),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _reconstruct_cached(
+    analysis_id: str, updated_at: str, payload_json: bytes
+) -> FaceAnalysisResult:
+    """Reconstruct FaceAnalysisResult from canonical row JSON (cached)."""
+    data = orjson.loads(payload_json)
+    image_info = {
+        "filename": data["original_filename"],
+        "dimensions": data.get("image_dimensions", ""),
+        "total_landmarks": 468,
+    }
+
+    if not settings.trust_db_results:
         return FaceAnalysisResult(
             timestamp=datetime.fromisoformat(data["created_at"]),
-            image_info={
-                "filename": data["original_filename"],
-                "dimensions": data.get("image_dimensions", ""),
-                "total_landmarks": 468,
-            },
-            face_angle=data["face_angle"],
-            face_contour=data["face_contour"],
-            eline=data["eline_analysis"],
-            proportions=data["face_proportions"],
-            philtrum_chin=data["philtrum_chin_ratio"],
-            nasolabial_angle=data["nasolabial_angle"],
-            vline=data["vline_analysis"],
-            symmetry=data["symmetry_analysis"],
-            dental_protrusion=data["dental_protrusion"],
-            facial_harmony=data["facial_harmony"],
-            overall_score=data["overall_score"],
+            image_info=image_info,
             beauty_advice=data["beauty_advice"],
             angle_warning=data.get("angle_warning"),
+            **{
+                field: data[column]
+                for field, (_, column) in _RESULT_SUBMODELS.items()
+            },
         )
 
-
-# Global service instances
-_analysis_service_instance: AnalysisService | None = None
+    # Rows were validated on the way in, so skip re-validation on the way out
+    return FaceAnalysisResult.model_construct(
+        timestamp=datetime.fromisoformat(data["created_at"]),
+        image_info=image_info,
+        beauty_advice=data["beauty_advice"],
+        angle_warning=data.get("angle_warning"),
+        **{
+            field: model.model_construct(**data[column])
+            for field, (model, column) in _RESULT_SUBMODELS.items()
+        },
+    )
 
 
+@functools.lru_cache(maxsize=8)
 def get_analysis_service(supabase_client: Client) -> AnalysisService:
-    """Get or create analysis service instance."""
-    global _analysis_service_instance
-    if _analysis_service_instance is None:
-        _analysis_service_instance = AnalysisService(supabase_client)
-    return _analysis_service_instance
\ No newline at end of file
+    """Get or create analysis service instance for a Supabase client."""
+    return AnalysisService(supabase_client)
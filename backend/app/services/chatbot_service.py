@@ -1,10 +1,18 @@
 """ChatGPT-powered beauty consultation chatbot service."""
 
 import asyncio
-from datetime import datetime
-from typing import Any
+import functools
+import re
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import Any, Final
 from uuid import UUID, uuid4
 
+import httpx
+import orjson
+import tiktoken
 from openai import AsyncOpenAI
 from loguru import logger
 from supabase import Client
@@ -13,19 +21,78 @@ from app.config import settings
 from app.models.analysis import FaceAnalysisResult
 from app.models.chat import ChatMessage, ChatRequest, ChatResponse, ChatSession
 from app.utils.exceptions import ChatbotError, DatabaseError
+from app.utils.rate_limiter import RateLimiter
+from app.utils.semantic_cache import SemanticCache
+from app.utils.write_queue import BatchWriteQueue
+
+# Keywords that mark a sentence as an actionable beauty tip
+_TIP_KEYWORDS_RE = re.compile("おすすめ|コツ|方法|ポイント|テクニック")
+
+# Recent messages kept per session, and how many sessions keep them
+_HISTORY_LENGTH = 20
+_HISTORY_CACHE_SESSIONS = 1024
+
+# Approximate chat-format overhead per message (role and separators)
+_TOKENS_PER_MESSAGE = 4
+
+# Structured output for non-streamed replies: the answer plus its follow-up
+# suggestions and tips in one call (kept small to preserve the prompt cache)
+_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "beauty_chat_reply",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "content": {"type": "string", "description": "ユーザーへの回答"},
+                "suggestions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "次に聞けるフォローアップ質問（最大4件）",
+                },
+                "beauty_tips": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "回答に含まれる実践的な美容のコツ（最大3件）",
+                },
+            },
+            "required": ["content", "suggestions", "beauty_tips"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Follow-up question suggestions
+_BASE_SUGGESTIONS = (
+    "メイクのコツを教えて",
+    "おすすめの美容製品は？",
+    "スキンケアについて相談したい",
+    "韓国コスメのおすすめは？",
+)
+_HIGH_SCORE_SUGGESTIONS = (
+    "この美しさを維持する方法は？",
+    "さらに魅力的になるには？",
+)
+_IMPROVEMENT_SUGGESTIONS = (
+    "改善できるポイントは？",
+    "効果的な美容法を教えて",
+)
+
+# Shared limiter so bursts queue here instead of fanning out into 429s
+_openai_limiter = RateLimiter(
+    max_concurrent_requests=settings.openai_max_concurrency,
+    requests_per_minute=settings.openai_requests_per_minute,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+)
 
 
 class BeautyChatbotService:
     """AI-powered beauty consultation chatbot using GPT-4o-mini."""
 
-    def __init__(self, supabase_client: Client) -> None:
-        """Initialize chatbot service."""
-        self.supabase = supabase_client
-        self.openai = AsyncOpenAI(api_key=settings.openai_api_key)
-        self.model = settings.openai_model or "gpt-4o-mini"  # Default to gpt-4o-mini
-        
-        # System prompt for beauty consultation
-        self.system_prompt = """
+    # System prompt for beauty consultation; kept byte-identical across
+    # requests so OpenAI's prompt prefix cache can hit
+    SYSTEM_PROMPT: Final[str] = """
 あなたは韓国の美容業界で豊富な経験を持つ、親しみやすい美容カウンセラーです。
 顔面分析の結果に基づいて、個別化された美容アドバイスを提供してください。
 
@@ -50,6 +117,21 @@ class BeautyChatbotService:
 - 危険な美容法は推奨しない
 """
 
+    def __init__(self, supabase_client: Client) -> None:
+        """Initialize chatbot service."""
+        self.supabase = supabase_client
+        self.openai = get_openai_client()
+        self.model = settings.openai_model or "gpt-4o-mini"  # Default to gpt-4o-mini
+        self.message_writer = BatchWriteQueue(supabase_client, "chat_messages")
+        self._encoding = _get_encoding(self.model)
+        self._system_message = {"role": "system", "content": self.SYSTEM_PROMPT}
+        self._system_tokens = self._count_tokens(self.SYSTEM_PROMPT)
+        self._history_cache: OrderedDict[str, deque[dict[str, str]]] = OrderedDict()
+        self.response_cache = SemanticCache(
+            threshold=settings.chat_cache_threshold,
+            ttl_seconds=settings.chat_cache_ttl,
+        )
+
     async def create_chat_session(
         self,
         user_id: UUID,
@@ -61,7 +143,9 @@ class BeautyChatbotService:
         """Create new chat session."""
         try:
             session_id = uuid4()
-            
+            session_id_str = str(session_id)
+            analysis_id_str = str(analysis_id) if analysis_id else None
+
             # Auto-generate title if not provided
             if not title:
                 if analysis_id:
@@ -71,11 +155,11 @@ class BeautyChatbotService:
 
             # Prepare session data
             session_data = {
-                "id": str(session_id),
+                "id": session_id_str,
                 "user_id": str(user_id),
                 "title": title,
                 "context_type": context_type,
-                "analysis_id": str(analysis_id) if analysis_id else None,
+                "analysis_id": analysis_id_str,
                 "is_active": True,
                 "message_count": 0,
                 "metadata": {},
@@ -101,7 +185,7 @@ class BeautyChatbotService:
                     message=initial_message,
                 )
 
-            logger.info(f"💬 Created chat session {session_id}")
+            logger.info(f"💬 Created chat session {session_id_str}")
             return session
 
         except Exception as e:
@@ -119,74 +203,101 @@ class BeautyChatbotService:
         analysis_id: UUID | None = None,
     ) -> ChatResponse:
         """Send message and get AI response."""
-        try:
-            logger.info(f"💬 Processing message in session {session_id}")
+        session_id_str = str(session_id)
 
-            # Get session and validate ownership
-            session = await self._get_session(session_id, user_id)
-
-            # Build conversation history
-            conversation_history = await self._get_conversation_history(session_id)
-
-            # Get analysis context if available
-            analysis_context = await self._get_analysis_context(
-                analysis_id or session.analysis_id
-            )
+        try:
+            logger.info(f"💬 Processing message in session {session_id_str}")
 
-            # Store user message
-            user_message_id = await self._store_message(
-                session_id=session_id,
-                role="user",
-                content=message,
-                analysis_reference=analysis_id,
+            session, conversation_history, analysis_context = await self._prepare_turn(
+                session_id_str, user_id, message, analysis_id
             )
 
-            # Generate AI response
-            ai_response = await self._generate_ai_response(
+            # Generate AI response (or reuse one for a near-duplicate question)
+            ai_response = await self._get_ai_response(
                 user_message=message,
                 conversation_history=conversation_history,
                 analysis_context=analysis_context,
-                session_context=session.conversation_context,
+                session=session,
             )
 
-            # Store AI response
-            ai_message_id = await self._store_message(
-                session_id=session_id,
-                role="assistant",
-                content=ai_response["content"],
-                metadata={
-                    "model_used": ai_response["model"],
-                    "tokens_used": ai_response["tokens"],
-                    "response_time_ms": ai_response["response_time"],
-                },
+            response = await self._finish_turn(
+                session_id, session_id_str, ai_response, analysis_context
+            )
+
+            logger.info(f"✅ Generated AI response for session {session_id_str}")
+            return response
+
+        except Exception as e:
+            logger.error(f"Failed to process message: {str(e)}")
+            raise ChatbotError(
+                f"Failed to process message: {str(e)}",
+                provider="openai",
+            ) from e
+
+    async def stream_message(
+        self,
+        session_id: UUID,
+        user_id: UUID,
+        message: str,
+        analysis_id: UUID | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Send message and stream the AI response as it is generated.
+
+        Yields ``{"type": "delta", "content": ...}`` events while the answer
+        streams in, then a single ``{"type": "done", "response": ChatResponse}``.
+        """
+        session_id_str = str(session_id)
+
+        try:
+            logger.info(f"💬 Streaming message in session {session_id_str}")
+
+            session, conversation_history, analysis_context = await self._prepare_turn(
+                session_id_str, user_id, message, analysis_id
             )
 
-            # Generate follow-up suggestions
-            suggestions = await self._generate_suggestions(
-                ai_response["content"], analysis_context
+            start_ns = time.perf_counter_ns()
+            cached_content, embedding = await self._lookup_cached_response(
+                message, conversation_history, analysis_context, session
             )
 
-            # Extract beauty tips from response
-            beauty_tips = self._extract_beauty_tips(ai_response["content"])
-
-            # Create response
-            response = ChatResponse(
-                message=ai_response["content"],
-                session_id=session_id,
-                message_id=ai_message_id,
-                suggestions=suggestions,
-                analysis_insights=analysis_context or {},
-                beauty_tips=beauty_tips,
-                created_at=datetime.now(),
+            if cached_content is not None:
+                yield {"type": "delta", "content": cached_content}
+                ai_response = self._cached_ai_response(cached_content, start_ns)
+            else:
+                chunks: list[str] = []
+                usage: dict[str, int] = {}
+                async for delta in self._stream_ai_response(
+                    user_message=message,
+                    conversation_history=conversation_history,
+                    analysis_context=analysis_context,
+                    session_context=session.metadata,
+                    usage=usage,
+                ):
+                    chunks.append(delta)
+                    yield {"type": "delta", "content": delta}
+
+                ai_response = {
+                    "content": "".join(chunks),
+                    "model": self.model,
+                    "tokens": usage.get("total_tokens", 0),
+                    "response_time": (time.perf_counter_ns() - start_ns) // 1_000_000,
+                }
+                if embedding is not None and ai_response["content"]:
+                    self.response_cache.store(
+                        session.context_type, embedding, ai_response["content"]
+                    )
+
+            response = await self._finish_turn(
+                session_id, session_id_str, ai_response, analysis_context
             )
 
-            logger.info(f"✅ Generated AI response for session {session_id}")
-            return response
+            logger.info(f"✅ Streamed AI response for session {session_id_str}")
+            yield {"type": "done", "response": response}
 
         except Exception as e:
-            logger.error(f"Failed to process message: {str(e)}")
+            logger.error(f"Failed to stream message: {str(e)}")
             raise ChatbotError(
-                f"Failed to process message: {str(e)}",
+                f"Failed to stream message: {str(e)}",
                 provider="openai",
             ) from e
 
@@ -220,7 +331,7 @@ class BeautyChatbotService:
         """Get messages from a chat session."""
         try:
             # Verify session ownership
-            await self._get_session(session_id, user_id)
+            await self._assert_session_owned(session_id, user_id)
 
             response = (
                 self.supabase.table("chat_messages")
@@ -241,6 +352,208 @@ class BeautyChatbotService:
                 operation="get_session_messages",
             ) from e
 
+    async def _prepare_turn(
+        self,
+        session_id_str: str,
+        user_id: UUID,
+        message: str,
+        analysis_id: UUID | None,
+    ) -> tuple[ChatSession, list[dict[str, str]], dict[str, Any] | None]:
+        """Load the context for a turn and queue the user message."""
+        analysis_id_str = str(analysis_id) if analysis_id else None
+        history = self._history_cache.get(session_id_str)
+
+        # Fetch session, history and analysis context in one round-trip; the
+        # analysis context falls back to the session's own analysis, and the
+        # history is only fetched when this worker hasn't cached it yet
+        session, fetched_history, analysis_context = await self._bootstrap_chat(
+            session_id_str, str(user_id), analysis_id_str,
+            include_history=history is None,
+        )
+
+        if history is None:
+            history = deque(fetched_history, maxlen=_HISTORY_LENGTH)
+        self._cache_history(session_id_str, history)
+        conversation_history = list(history)
+        history.append({"role": "user", "content": message})
+
+        # Queued ahead of the assistant message, so turn order is preserved
+        await self._store_message(
+            session_id_str=session_id_str,
+            role="user",
+            content=message,
+            analysis_reference_str=analysis_id_str,
+        )
+
+        return session, conversation_history, analysis_context
+
+    async def _finish_turn(
+        self,
+        session_id: UUID,
+        session_id_str: str,
+        ai_response: dict[str, Any],
+        analysis_context: dict[str, Any] | None,
+    ) -> ChatResponse:
+        """Queue the AI response and build suggestions and tips."""
+        content = ai_response["content"]
+        history = self._history_cache.get(session_id_str)
+        if history is not None:
+            history.append({"role": "assistant", "content": content})
+        ai_message_id = await self._store_message(
+            session_id_str=session_id_str,
+            role="assistant",
+            content=content,
+            metadata={
+                "model_used": ai_response["model"],
+                "tokens_used": ai_response["tokens"],
+                "response_time_ms": ai_response["response_time"],
+            },
+        )
+
+        # Prefer what the model returned alongside its answer; streamed and
+        # cached answers fall back to the cheap local heuristics
+        suggestions = ai_response.get("suggestions") or self._generate_suggestions(
+            content, analysis_context
+        )
+        beauty_tips = ai_response.get("beauty_tips") or self._extract_beauty_tips(content)
+
+        return ChatResponse(
+            message=content,
+            session_id=session_id,
+            message_id=ai_message_id,
+            suggestions=suggestions,
+            analysis_insights=analysis_context or {},
+            beauty_tips=beauty_tips,
+            created_at=datetime.now(),
+        )
+
+    async def _get_ai_response(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        analysis_context: dict[str, Any] | None,
+        session: ChatSession,
+    ) -> dict[str, Any]:
+        """Get AI response, serving generic questions from the semantic cache."""
+        start_ns = time.perf_counter_ns()
+        cached_content, embedding = await self._lookup_cached_response(
+            user_message, conversation_history, analysis_context, session
+        )
+        if cached_content is not None:
+            return self._cached_ai_response(cached_content, start_ns)
+
+        ai_response = await self._generate_ai_response(
+            user_message=user_message,
+            conversation_history=conversation_history,
+            analysis_context=analysis_context,
+            session_context=session.metadata,
+        )
+        if embedding is not None and ai_response["content"]:
+            self.response_cache.store(
+                session.context_type, embedding, ai_response["content"]
+            )
+        return ai_response
+
+    async def _lookup_cached_response(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        analysis_context: dict[str, Any] | None,
+        session: ChatSession,
+    ) -> tuple[str | None, list[float] | None]:
+        """Look up a cached answer; returns it and the message embedding."""
+        # Answers built from a user's analysis or history are personal; only
+        # opening questions in sessions not tied to an analysis are shared
+        if (
+            not settings.chat_cache_enabled
+            or analysis_context
+            or conversation_history
+            or session.analysis_id
+        ):
+            return None, None
+
+        embedding = await self._embed(user_message)
+        cached_content = self.response_cache.lookup(session.context_type, embedding)
+        if cached_content is not None:
+            logger.info(f"♻️ Semantic cache hit in session {session.id}")
+        return cached_content, embedding
+
+    def _cached_ai_response(
+        self, content: str, start_ns: int
+    ) -> dict[str, Any]:
+        """Build AI response data for a semantic cache hit."""
+        return {
+            "content": content,
+            "model": "semantic-cache",
+            "tokens": 0,
+            "response_time": (time.perf_counter_ns() - start_ns) // 1_000_000,
+        }
+
+    async def _embed(self, text: str) -> list[float]:
+        """Embed text for semantic cache lookups."""
+        response = await self.openai.embeddings.create(
+            model=settings.openai_embedding_model,
+            input=text,
+        )
+        return response.data[0].embedding
+
+    def _build_messages(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        analysis_context: dict[str, Any] | None,
+        session_context: dict[str, Any],
+    ) -> list[dict[str, str]]:
+        """Build the message list for OpenAI."""
+        # Add analysis context if available, reusing the text formatted at
+        # session creation when it is about the same analysis
+        context_messages: list[dict[str, str]] = []
+        if analysis_context:
+            context_message = None
+            if analysis_context == session_context.get("analysis_summary"):
+                context_message = session_context.get("formatted_analysis")
+            if context_message is None:
+                context_message = self._format_analysis_context(analysis_context)
+            context_messages.append({"role": "system", "content": context_message})
+
+        # Token budget left for history after the reply, the system
+        # messages and the current user message
+        budget = (
+            settings.openai_context_window
+            - settings.openai_max_tokens
+            - self._system_tokens
+            - sum(self._count_tokens(m["content"]) for m in context_messages)
+            - self._count_tokens(user_message)
+        )
+        if budget < 0:
+            raise ChatbotError("Message is too long for the model context window")
+
+        # Add as much recent conversation history as fits, newest first
+        history: list[dict[str, str]] = []
+        for past_message in reversed(conversation_history):
+            budget -= self._count_tokens(past_message["content"])
+            if budget < 0:
+                break
+            history.append(past_message)
+
+        return [
+            self._system_message,
+            *context_messages,
+            *reversed(history),
+            {"role": "user", "content": user_message},
+        ]
+
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens in a message, including per-message overhead."""
+        return len(self._encoding.encode(text)) + _TOKENS_PER_MESSAGE
+
+    def _estimate_tokens(self, messages: list[dict[str, str]]) -> int:
+        """Estimate prompt plus completion tokens for rate limiting."""
+        return (
+            sum(self._count_tokens(m["content"]) for m in messages)
+            + settings.openai_max_tokens
+        )
+
     async def _generate_ai_response(
         self,
         user_message: str,
@@ -250,39 +563,34 @@ class BeautyChatbotService:
     ) -> dict[str, Any]:
         """Generate AI response using OpenAI GPT-4o-mini."""
         try:
-            start_time = datetime.now()
+            start_ns = time.perf_counter_ns()
 
             # Build messages for OpenAI
-            messages = [{"role": "system", "content": self.system_prompt}]
-
-            # Add analysis context if available
-            if analysis_context:
-                context_message = self._format_analysis_context(analysis_context)
-                messages.append({"role": "system", "content": context_message})
-
-            # Add conversation history
-            messages.extend(conversation_history[-10:])  # Last 10 messages for context
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
-
-            # Call OpenAI API
-            response = await self.openai.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=settings.openai_max_tokens,
-                temperature=0.7,
-                presence_penalty=0.1,
-                frequency_penalty=0.1,
+            messages = self._build_messages(
+                user_message, conversation_history, analysis_context, session_context
             )
 
+            # Call OpenAI API once the limiter admits the estimated tokens
+            async with _openai_limiter.limit(self._estimate_tokens(messages)):
+                response = await self.openai.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=settings.openai_max_tokens,
+                    temperature=0.7,
+                    presence_penalty=0.1,
+                    frequency_penalty=0.1,
+                    response_format=_RESPONSE_FORMAT,
+                )
+
             # Extract response data
-            content = response.choices[0].message.content or ""
+            structured = _parse_structured_reply(response.choices[0])
             tokens_used = response.usage.total_tokens if response.usage else 0
-            response_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            response_time = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             return {
-                "content": content,
+                "content": structured.get("content", ""),
+                "suggestions": structured.get("suggestions", [])[:4],
+                "beauty_tips": structured.get("beauty_tips", [])[:3],
                 "model": self.model,
                 "tokens": tokens_used,
                 "response_time": response_time,
@@ -295,48 +603,101 @@ class BeautyChatbotService:
                 provider="openai",
             ) from e
 
-    async def _get_session(self, session_id: UUID, user_id: UUID) -> ChatSession:
-        """Get session and verify ownership."""
+    async def _stream_ai_response(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        analysis_context: dict[str, Any] | None,
+        session_context: dict[str, Any],
+        usage: dict[str, int],
+    ) -> AsyncIterator[str]:
+        """Stream AI response deltas, recording token usage into ``usage``."""
         try:
-            response = (
-                self.supabase.table("chat_sessions")
-                .select("*")
-                .eq("id", str(session_id))
-                .eq("user_id", str(user_id))
-                .single()
-                .execute()
+            messages = self._build_messages(
+                user_message, conversation_history, analysis_context, session_context
             )
 
-            if not response.data:
-                raise ChatbotError("Chat session not found or access denied")
+            # Only opening the stream takes a slot; a slow or abandoned
+            # consumer must not hold it while the generator is suspended
+            async with _openai_limiter.limit(self._estimate_tokens(messages)):
+                stream = await self.openai.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=settings.openai_max_tokens,
+                    temperature=0.7,
+                    presence_penalty=0.1,
+                    frequency_penalty=0.1,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
 
-            return ChatSession(**response.data)
+            # Closes the HTTP response even if the consumer stops early
+            async with stream:
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage["total_tokens"] = chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
 
+        except Exception as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise ChatbotError(
+                f"AI response streaming failed: {str(e)}",
+                provider="openai",
+            ) from e
+
+    async def _assert_session_owned(self, session_id: UUID, user_id: UUID) -> None:
+        """Verify session ownership without transferring the session row."""
+        try:
+            response = await asyncio.to_thread(
+                self.supabase.table("chat_sessions")
+                .select("id", count="exact", head=True)
+                .eq("id", str(session_id))
+                .eq("user_id", str(user_id))
+                .execute
+            )
         except Exception as e:
             raise ChatbotError(f"Failed to get session: {str(e)}") from e
 
-    async def _get_conversation_history(
-        self, session_id: UUID
-    ) -> list[dict[str, str]]:
-        """Get recent conversation history."""
+        if response.count != 1:
+            raise ChatbotError("Chat session not found or access denied")
+
+    async def _bootstrap_chat(
+        self,
+        session_id_str: str,
+        user_id_str: str,
+        analysis_id_str: str | None,
+        include_history: bool = True,
+    ) -> tuple[ChatSession, list[dict[str, str]], dict[str, Any] | None]:
+        """Get session (verifying ownership), recent history and analysis context."""
         try:
-            response = (
-                self.supabase.table("chat_messages")
-                .select("role, content")
-                .eq("session_id", str(session_id))
-                .order("created_at", desc=False)
-                .limit(20)
-                .execute()
+            response = await asyncio.to_thread(
+                self.supabase.rpc(
+                    "chat_bootstrap",
+                    {
+                        "p_session_id": session_id_str,
+                        "p_user_id": user_id_str,
+                        "p_analysis_id": analysis_id_str,
+                        "p_include_history": include_history,
+                    },
+                ).execute
             )
 
-            return [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in response.data
-            ]
+            if not response.data:
+                raise ChatbotError("Chat session not found or access denied")
+
+            data = response.data
+            return ChatSession(**data["session"]), data["history"], data["analysis"]
 
         except Exception as e:
-            logger.error(f"Failed to get conversation history: {str(e)}")
-            return []
+            raise ChatbotError(f"Failed to get session: {str(e)}") from e
+
+    def _cache_history(self, session_id_str: str, history: deque[dict[str, str]]) -> None:
+        """Keep a session's recent history, evicting the least recently used."""
+        self._history_cache[session_id_str] = history
+        self._history_cache.move_to_end(session_id_str)
+        if len(self._history_cache) > _HISTORY_CACHE_SESSIONS:
+            self._history_cache.popitem(last=False)
 
     async def _get_analysis_context(
         self, analysis_id: UUID | None
@@ -362,37 +723,31 @@ class BeautyChatbotService:
 
     async def _store_message(
         self,
-        session_id: UUID,
+        session_id_str: str,
         role: str,
         content: str,
-        analysis_reference: UUID | None = None,
+        analysis_reference_str: str | None = None,
         metadata: dict[str, Any] | None = None,
     ) -> UUID:
-        """Store message in database."""
-        try:
-            message_id = uuid4()
-            message_data = {
-                "id": str(message_id),
-                "session_id": str(session_id),
-                "role": role,
-                "content": content,
-                "metadata": metadata or {},
-                "analysis_reference": str(analysis_reference) if analysis_reference else None,
-            }
-
-            if role == "assistant" and metadata:
-                message_data.update({
-                    "model_used": metadata.get("model_used"),
-                    "tokens_used": metadata.get("tokens_used"),
-                    "response_time_ms": metadata.get("response_time_ms"),
-                })
-
-            self.supabase.table("chat_messages").insert(message_data).execute()
-            return message_id
+        """Queue message for a batched database insert and return its ID."""
+        message_id = uuid4()
+        is_assistant = role == "assistant" and metadata
+        message_data = {
+            "id": str(message_id),
+            "session_id": session_id_str,
+            "role": role,
+            "content": content,
+            "metadata": metadata or {},
+            "analysis_reference": analysis_reference_str,
+            "model_used": metadata.get("model_used") if is_assistant else None,
+            "tokens_used": metadata.get("tokens_used") if is_assistant else None,
+            "response_time_ms": metadata.get("response_time_ms") if is_assistant else None,
+            # Set here so rows written in the same batch keep their order
+            "created_at": datetime.now(UTC).isoformat(),
+        }
 
-        except Exception as e:
-            logger.error(f"Failed to store message: {str(e)}")
-            raise DatabaseError(f"Failed to store message: {str(e)}") from e
+        self.message_writer.put(message_data)
+        return message_id
 
     async def _build_conversation_context(
         self, user_id: UUID, analysis_id: UUID | None
@@ -410,76 +765,147 @@ class BeautyChatbotService:
             analysis_context = await self._get_analysis_context(analysis_id)
             if analysis_context:
                 context["analysis_summary"] = analysis_context
+                context["formatted_analysis"] = self._format_analysis_context(
+                    analysis_context
+                )
 
         return context
 
-    def _format_analysis_context(self, analysis_context: dict[str, Any]) -> str:
+    @staticmethod
+    def _format_analysis_context(analysis_context: dict[str, Any]) -> str:
         """Format analysis context for AI prompt."""
-        context_text = "【分析結果情報】\n"
-        
+        overall = None
         if "overall_score" in analysis_context:
             score_data = analysis_context["overall_score"]
-            context_text += f"総合スコア: {score_data.get('score', 'N/A')}/100\n"
-            context_text += f"美容レベル: {score_data.get('level', 'N/A')}\n"
-            context_text += f"説明: {score_data.get('description', 'N/A')}\n"
+            overall = (
+                score_data.get("score", "N/A"),
+                score_data.get("level", "N/A"),
+                score_data.get("description", "N/A"),
+            )
 
+        harmony = None
         if "facial_harmony" in analysis_context:
             harmony_data = analysis_context["facial_harmony"]
-            context_text += f"パーツ調和性: {harmony_data.get('harmony_score', 'N/A')}/100\n"
-            context_text += f"美しさレベル: {harmony_data.get('beauty_level', 'N/A')}\n"
+            harmony = (
+                harmony_data.get("harmony_score", "N/A"),
+                harmony_data.get("beauty_level", "N/A"),
+            )
 
-        context_text += "\nこの分析結果を踏まえて、具体的で励ましのあるアドバイスをしてください。"
-        return context_text
+        return _format_analysis_fields(overall, harmony)
 
-    async def _generate_suggestions(
+    def _generate_suggestions(
         self, ai_response: str, analysis_context: dict[str, Any] | None
     ) -> list[str]:
         """Generate follow-up question suggestions."""
-        base_suggestions = [
-            "メイクのコツを教えて",
-            "おすすめの美容製品は？",
-            "スキンケアについて相談したい",
-            "韓国コスメのおすすめは？",
-        ]
+        suggestions = _BASE_SUGGESTIONS
 
         # Add analysis-specific suggestions
         if analysis_context and "overall_score" in analysis_context:
             score = analysis_context["overall_score"].get("score", 0)
             if score >= 80:
-                base_suggestions.extend([
-                    "この美しさを維持する方法は？",
-                    "さらに魅力的になるには？",
-                ])
+                suggestions = (*_BASE_SUGGESTIONS, *_HIGH_SCORE_SUGGESTIONS)
             else:
-                base_suggestions.extend([
-                    "改善できるポイントは？",
-                    "効果的な美容法を教えて",
-                ])
+                suggestions = (*_BASE_SUGGESTIONS, *_IMPROVEMENT_SUGGESTIONS)
 
-        return base_suggestions[:4]  # Return top 4 suggestions
+        return list(suggestions[:4])  # Return top 4 suggestions
 
     def _extract_beauty_tips(self, ai_response: str) -> list[str]:
         """Extract actionable beauty tips from AI response."""
         tips = []
-        
-        # Simple extraction based on common patterns
-        sentences = ai_response.split('。')
-        for sentence in sentences:
-            if any(keyword in sentence for keyword in ['おすすめ', 'コツ', '方法', 'ポイント', 'テクニック']):
-                clean_sentence = sentence.strip() + '。' if sentence.strip() else ''
-                if len(clean_sentence) > 10:  # Minimum length
-                    tips.append(clean_sentence)
-        
-        return tips[:3]  # Return top 3 tips
-
-
-# Global service instance
-_chatbot_service_instance: BeautyChatbotService | None = None
-
 
+        # Simple extraction based on common patterns
+        for sentence in ai_response.split('。'):
+            if not _TIP_KEYWORDS_RE.search(sentence):
+                continue
+            clean_sentence = sentence.strip() + '。' if sentence.strip() else ''
+            if len(clean_sentence) > 10:  # Minimum length
+                tips.append(clean_sentence)
+                if len(tips) == 3:  # Return top 3 tips
+                    break
+
+        return tips
+
+
+def _parse_structured_reply(choice: Any) -> dict[str, Any]:
+    """Parse the JSON reply, falling back to the raw text when it is unusable."""
+    message = choice.message
+    if getattr(message, "refusal", None):
+        return {"content": message.refusal}
+
+    raw = message.content or ""
+    if choice.finish_reason == "length":
+        logger.warning("OpenAI reply truncated at max_tokens, using raw text")
+        return {"content": raw}
+
+    try:
+        structured = orjson.loads(raw or "{}")
+    except orjson.JSONDecodeError:
+        logger.warning("OpenAI reply is not valid JSON, using raw text")
+        return {"content": raw}
+    return structured if isinstance(structured, dict) else {"content": raw}
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_analysis_fields(
+    overall: tuple[Any, Any, Any] | None, harmony: tuple[Any, Any] | None
+) -> str:
+    """Render the analysis prompt text for the displayed score fields."""
+    context_text = "【分析結果情報】\n"
+
+    if overall is not None:
+        score, level, description = overall
+        context_text += f"総合スコア: {score}/100\n"
+        context_text += f"美容レベル: {level}\n"
+        context_text += f"説明: {description}\n"
+
+    if harmony is not None:
+        harmony_score, beauty_level = harmony
+        context_text += f"パーツ調和性: {harmony_score}/100\n"
+        context_text += f"美しさレベル: {beauty_level}\n"
+
+    context_text += "\nこの分析結果を踏まえて、具体的で励ましのあるアドバイスをしてください。"
+    return context_text
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Get the tokenizer for a model, falling back to the GPT-4o encoding."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+async def load_tokenizer() -> None:
+    """Load the chat model's tokenizer off the event loop (call on startup).
+
+    tiktoken downloads the BPE file on first use; loading it here keeps that
+    blocking fetch out of the first request that builds the chatbot service.
+    """
+    model = settings.openai_model or "gpt-4o-mini"
+    try:
+        await asyncio.to_thread(_get_encoding, model)
+    except Exception as e:
+        logger.warning(f"Failed to preload tokenizer for {model}: {str(e)}")
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared OpenAI client with a warm HTTP/2 connection pool."""
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=50,
+                keepalive_expiry=60,
+            ),
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=8)
 def get_chatbot_service(supabase_client: Client) -> BeautyChatbotService:
-    """Get or create chatbot service instance."""
-    global _chatbot_service_instance
-    if _chatbot_service_instance is None:
-        _chatbot_service_instance = BeautyChatbotService(supabase_client)
-    return _chatbot_service_instance
\ No newline at end of file
+    """Get or create chatbot service instance for a Supabase client."""
+    return BeautyChatbotService(supabase_client)
\ No newline at end of file
@@ -3,15 +3,22 @@
 import asyncio
 import hashlib
 import hmac
-import json
 import base64
-from datetime import datetime
-from typing import Any
+import re
+import functools
+import warnings
+import weakref
+import time
+from datetime import UTC, datetime
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, NamedTuple
 from uuid import UUID, uuid4
 
 import httpx
 from linebot.v3.webhook import WebhookParser
 from linebot.v3.messaging import (
+    ApiException,
     AsyncApiClient,
     AsyncMessagingApi,
     Configuration,
@@ -26,7 +33,7 @@ from linebot.v3.messaging import (
     MessageAction,
     URIAction,
     QuickReply,
-    QuickReplyButton,
+    QuickReplyItem,
     FlexMessage
 )
 from linebot.v3.exceptions import InvalidSignatureError
@@ -41,17 +48,249 @@ from loguru import logger
 from supabase import Client
 
 from app.config import settings
+from app.db import get_pool, record_to_dict
 from app.models.linebot import (
     LineBotUser, LineBotUserCreate, LineBotAnalysisRequest, LineBotResponse
 )
 from app.services.analysis_service import get_analysis_service
 from app.services.chatbot_service import get_chatbot_service
-from app.utils.exceptions import LineBotError, AnalysisError
+from app.utils.exceptions import (
+    AnalysisError,
+    AuthorizationError,
+    FileUploadError,
+    LineBotError,
+)
+from app.utils.ttl_cache import TTLCache
+
+# How long a resolved LINE user is served without a database round-trip
+_USER_CACHE_TTL = 300
+_USER_CACHE_SIZE = 4096
+
+# LINE profiles change rarely; refetch at most once a day per user
+_PROFILE_CACHE_TTL = 24 * 60 * 60
+
+# Finished analyses kept to answer redelivered image events
+_ANALYSIS_CACHE_TTL = 60 * 60
+_ANALYSIS_CACHE_SIZE = 256
+
+# Content endpoint for message media, served outside the Messaging API SDK
+_LINE_CONTENT_URL = "https://api-data.line.me/v2/bot/message/{message_id}/content"
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Seconds to let background event handling finish on shutdown
+_SHUTDOWN_DRAIN_TIMEOUT = 60
+
+# Live services, whose clients are closed on application shutdown
+_linebot_services: "weakref.WeakSet[LineBotService]" = weakref.WeakSet()
+
+# Japanese display names for detailed score keys
+_FEATURE_NAMES = MappingProxyType({
+    "eline": "Eライン",
+    "harmony": "パーツ調和",
+    "symmetry": "対称性",
+    "proportions": "顔の比率",
+    "vline": "Vライン",
+    "nasolabial": "鼻唇角",
+    "dental": "歯列・唇",
+    "contour": "輪郭",
+    "philtrum_chin": "人中・顎",
+})
+
+# Static parts of the detailed analysis carousel
+_OVERALL_CARD_THUMBNAIL = "https://example.com/overall-score.jpg"  # Replace with actual image
+_OVERALL_CARD_ACTIONS = [
+    MessageAction(label="詳しく見る", text="総合スコアについて教えて"),
+    URIAction(label="Webで確認", uri="https://your-domain.com/analysis"),  # Replace with actual URL
+]
+
+
+class _CarouselFeature(NamedTuple):
+    """Prebuilt carousel card fields for one analysis feature."""
+
+    key: str
+    analysis_key: str
+    title: str
+    thumbnail_url: str
+    actions: list[MessageAction]
+
+
+def _carousel_feature(key: str, name: str, emoji: str) -> _CarouselFeature:
+    """Build the static card fields for a feature."""
+    return _CarouselFeature(
+        key=key,
+        analysis_key=f"{key}_analysis",
+        title=f"{emoji} {name}",
+        thumbnail_url=f"https://example.com/{key}.jpg",  # Replace with actual images
+        actions=[
+            MessageAction(label="詳細", text=f"{name}について詳しく教えて"),
+            MessageAction(label="改善方法", text=f"{name}の改善方法は？"),
+        ],
+    )
+
+
+# Feature cards after the overall score (LINE carousels stay short)
+_CAROUSEL_FEATURES: tuple[_CarouselFeature, ...] = (
+    _carousel_feature("eline", "Eライン", "💋"),
+    _carousel_feature("facial_harmony", "パーツ調和", "🌟"),
+    _carousel_feature("symmetry", "対称性", "⚖️"),
+)
+
+# Static replies, built once and shared by every send
+_WELCOME_TEXT = """🌟 Face Aesthetic AI へようこそ！
+
+私はあなたの美容パートナーです ✨
+
+【できること】
+📷 顔写真の美容分析
+💬 美容相談・アドバイス
+📊 詳細レポート生成
+
+【使い方】
+1. 写真を送信 → 即座に分析
+2. 「相談」と送信 → AI美容コンサル
+3. 「ヘルプ」と送信 → 詳しい使い方
+
+まずは写真を送ってみてください！"""
+_WELCOME_QUICK_REPLY = QuickReply(items=[
+    QuickReplyItem(action=MessageAction(label="📷 写真分析", text="写真を送信してください")),
+    QuickReplyItem(action=MessageAction(label="💬 美容相談", text="相談")),
+    QuickReplyItem(action=MessageAction(label="❓ ヘルプ", text="ヘルプ")),
+])
+_WELCOME_MESSAGES = [
+    TextMessage(text=_WELCOME_TEXT, quick_reply=_WELCOME_QUICK_REPLY)
+]
+
+_HELP_TEXT = """📖 Face Aesthetic AI 使い方ガイド
+
+【写真分析の手順】
+1. 顔全体が写った正面写真を送信
+2. AI が468点の顔面ランドマークを検出
+3. 韓国美容基準で詳細分析
+4. 美容スコアとアドバイスを提供
+
+【写真撮影のコツ】
+✅ 正面を向いて表情なし
+✅ 明るい場所で撮影
+✅ 髪で顔が隠れないように
+✅ メイクは薄めがベスト
+
+【分析項目】
+• Eライン • パーツ調和性
+• 顔の対称性 • 輪郭分析
+• Vライン • 鼻唇角
+
+【コマンド】
+- 「分析」→ 分析について
+- 「相談」→ AI美容コンサル
+- 「スタート」→ 最初から"""
+_HELP_MESSAGES = [TextMessage(text=_HELP_TEXT)]
+
+_ANALYSIS_INSTRUCTION_TEXT = """📸 美容分析を始めましょう！
+
+以下の点にご注意ください：
+
+✨ より正確な分析のために
+• 正面を向いた写真
+• 十分な明るさ
+• 表情は自然な状態
+• 顔全体がはっきり見える
+
+📊 分析される項目
+• 総合美容スコア
+• Eライン評価
+• パーツ調和性
+• 対称性分析
+• 輪郭・Vライン
+• 詳細な改善アドバイス
+
+準備ができたら写真を送信してください 📷"""
+_ANALYSIS_INSTRUCTION_QUICK_REPLY = QuickReply(items=[
+    QuickReplyItem(action=MessageAction(label="📷 写真を送信", text="写真を送信します")),
+    QuickReplyItem(action=MessageAction(label="💡 撮影のコツ", text="撮影のコツを教えて")),
+])
+_ANALYSIS_INSTRUCTION_MESSAGES = [
+    TextMessage(text=_ANALYSIS_INSTRUCTION_TEXT, quick_reply=_ANALYSIS_INSTRUCTION_QUICK_REPLY)
+]
+
+_PROCESSING_TEXT = """🔍 AI分析中です...
+
+お写真を受信しました！
+最先端のAI技術で詳細に分析しています。
+
+⏱️ 分析時間: 約30-60秒
+🧠 AI処理: 468点の顔面ランドマーク検出
+📊 評価項目: 8つの美容指標
+
+少々お待ちください ✨"""
+_PROCESSING_MESSAGES = [TextMessage(text=_PROCESSING_TEXT)]
+
+_CHAT_INTRO_TEXT = """💬 AI美容コンサルテーション
+
+韓国美容のプロフェッショナルAIがあなたの美容に関する質問にお答えします！
+
+【相談できること】
+• 分析結果の詳しい説明
+• 具体的な改善方法
+• おすすめコスメ・スキンケア
+• メイクテクニック
+• K-Beauty トレンド
+
+どんなことでもお気軽にご質問ください ✨"""
+_CHAT_INTRO_QUICK_REPLY = QuickReply(items=[
+    QuickReplyItem(action=MessageAction(label="分析結果について", text="分析結果について詳しく教えて")),
+    QuickReplyItem(action=MessageAction(label="改善方法", text="美容改善の具体的な方法は？")),
+    QuickReplyItem(action=MessageAction(label="韓国コスメ", text="おすすめの韓国コスメを教えて")),
+])
+_CHAT_INTRO_MESSAGES = [
+    TextMessage(text=_CHAT_INTRO_TEXT, quick_reply=_CHAT_INTRO_QUICK_REPLY)
+]
+
+_ERROR_TEXT = """😅 申し訳ございません
+
+一時的な問題が発生しました。
+しばらく時間をおいてから再度お試しください。
+
+📞 サポートが必要な場合
+• 「ヘルプ」と送信
+• Webサイトでお問い合わせ
+
+ご不便をおかけして申し訳ありません 🙏"""
+_ERROR_QUICK_REPLY = QuickReply(items=[
+    QuickReplyItem(action=MessageAction(label="🔄 再試行", text="もう一度")),
+    QuickReplyItem(action=MessageAction(label="❓ ヘルプ", text="ヘルプ")),
+])
+_ERROR_MESSAGES = [
+    TextMessage(text=_ERROR_TEXT, quick_reply=_ERROR_QUICK_REPLY)
+]
+
+# Longest message still routed by command keyword instead of the AI chat;
+# longer sentences (e.g. quick-reply questions) are real consultations
+_INTENT_MAX_LENGTH = 8
+
+# Evaluation keywords mapped to a score, checked in order
+_EVALUATION_SCORES: tuple[tuple[tuple[str, ...], float], ...] = (
+    (("理想", "優秀"), 90.0),
+    (("良好",), 80.0),
+    (("標準",), 70.0),
+)
 
 
 class LineBotService:
     """LINE Bot service for beauty analysis integration."""
 
+    # Exact-match text commands (casefolded) and the command they trigger
+    _COMMANDS: dict[str, str] = (
+        dict.fromkeys(("help", "ヘルプ", "使い方"), "help")
+        | dict.fromkeys(("start", "スタート", "開始"), "start")
+        | dict.fromkeys(("analysis", "分析", "美容分析"), "analysis")
+        | dict.fromkeys(("chat", "チャット", "相談"), "chat")
+    )
+
+    # Same keywords found inside a short message, longest first
+    _COMMAND_KEYWORDS_RE = re.compile(
+        "|".join(map(re.escape, sorted(_COMMANDS, key=len, reverse=True)))
+    )
+
     def __init__(self, supabase_client: Client) -> None:
         """Initialize LINE Bot service with v3 API."""
         self.supabase = supabase_client
@@ -61,7 +300,35 @@ class LineBotService:
         self.async_api_client = AsyncApiClient(configuration)
         self.line_bot_api = AsyncMessagingApi(self.async_api_client)
         self.parser = WebhookParser(settings.line_channel_secret)
+        self._line_secret_bytes = settings.line_channel_secret.encode("utf-8")
+
+        # Hot LINE users keyed by line_user_id
+        self._user_cache = TTLCache(
+            max_entries=_USER_CACHE_SIZE, ttl_seconds=_USER_CACHE_TTL
+        )
+        self._profile_cache = TTLCache(
+            max_entries=_USER_CACHE_SIZE, ttl_seconds=_PROFILE_CACHE_TTL
+        )
         
+        _linebot_services.add(self)
+
+        # Image analyses by LINE message id, in flight and recently finished
+        self._analysis_tasks: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._analysis_results = TTLCache(
+            max_entries=_ANALYSIS_CACHE_SIZE, ttl_seconds=_ANALYSIS_CACHE_TTL
+        )
+
+        # In-flight webhook event batches, kept referenced until done
+        self._event_tasks: set[asyncio.Task[None]] = set()
+
+        # Reply handlers for the text commands
+        self._command_handlers = {
+            "help": self._send_help_message,
+            "start": self._send_welcome_message,
+            "analysis": self._send_analysis_instruction,
+            "chat": self._handle_chat_request,
+        }
+
         # Analysis and chat services
         self.analysis_service = get_analysis_service(supabase_client)
         self.chatbot_service = get_chatbot_service(supabase_client)
@@ -82,35 +349,48 @@ class LineBotService:
             except Exception as e:
                 logger.error(f"Error handling event {event.type}: {str(e)}")
 
+    async def drain_events(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for in-flight events to finish."""
+        if self._event_tasks:
+            await asyncio.wait(self._event_tasks, timeout=timeout)
+
     async def verify_signature(self, body: bytes, signature: str) -> bool:
-        """Verify LINE webhook signature."""
+        """Verify LINE webhook signature.
+
+        Deprecated: ``handle_webhook`` verifies the signature once inside
+        ``WebhookParser.parse``; do not call this before it.
+        """
+        warnings.warn(
+            "verify_signature is deprecated; handle_webhook verifies signatures",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         try:
-            hash_value = hmac.new(
-                settings.line_channel_secret.encode('utf-8'),
-                body,
-                hashlib.sha256
-            ).digest()
-            expected_signature = base64.b64encode(hash_value).decode('utf-8')
-            
-            return hmac.compare_digest(signature, expected_signature)
-        except Exception as e:
+            provided = base64.b64decode(signature, validate=True)
+        except ValueError as e:
             logger.error(f"Signature verification failed: {str(e)}")
             return False
 
+        expected = hmac.new(self._line_secret_bytes, body, hashlib.sha256).digest()
+        return hmac.compare_digest(expected, provided)
+
     async def handle_webhook(self, body: str, signature: str) -> dict[str, Any]:
         """Handle LINE webhook events with v3 API."""
         try:
-            # Parse events using v3 parser
+            # Parse events using v3 parser (this is the only signature check)
             events = self.parser.parse(body, signature)
             
-            # Handle events
-            await self._handle_events(events)
+            # Handle events in the background so LINE gets its 200 before
+            # the redelivery timeout, even while an analysis runs
+            task = asyncio.create_task(self._handle_events(events))
+            self._event_tasks.add(task)
+            task.add_done_callback(self._event_tasks.discard)
             
-            return {"status": "success", "message": "Events processed"}
+            return {"status": "success", "message": "Events accepted"}
             
-        except InvalidSignatureError:
+        except InvalidSignatureError as e:
             logger.error("Invalid LINE webhook signature")
-            raise LineBotError("Invalid signature", provider="line")
+            raise AuthorizationError("Invalid signature") from e
         except Exception as e:
             logger.error(f"Webhook handling failed: {str(e)}")
             raise LineBotError(f"Webhook handling failed: {str(e)}", provider="line")
@@ -119,30 +399,38 @@ class LineBotService:
         """Handle text message events."""
         try:
             user_id = event.source.user_id
+            reply_token = event.reply_token
             message_text = event.message.text.strip()
             
             logger.info(f"📱 Received text from {user_id}: {message_text}")
             
-            # Get or create user
-            bot_user = await self._get_or_create_user(user_id)
-            
             # Handle different text commands
-            if message_text.lower() in ['help', 'ヘルプ', '使い方']:
-                await self._send_help_message(user_id)
-            elif message_text.lower() in ['start', 'スタート', '開始']:
-                await self._send_welcome_message(user_id)
-            elif message_text.lower() in ['analysis', '分析', '美容分析']:
-                await self._send_analysis_instruction(user_id)
-            elif message_text.lower() in ['chat', 'チャット', '相談']:
-                await self._handle_chat_request(user_id, message_text)
-            else:
-                # Default: treat as chat message
+            command = self._match_command(message_text)
+            if command is None:
+                # Default: treat as chat message (resolves the user itself)
                 await self._handle_chat_message(user_id, message_text)
+                return
+
+            # Get or create user while the command reply is in flight
+            await asyncio.gather(
+                self._get_or_create_user(user_id),
+                self._command_handlers[command](user_id, reply_token),
+            )
                 
         except Exception as e:
             logger.error(f"Failed to handle text message: {str(e)}")
             await self._send_error_message(event.source.user_id)
 
+    def _match_command(self, message_text: str) -> str | None:
+        """Match a text command exactly, or by keyword in a short message."""
+        folded = message_text.casefold()
+        command = self._COMMANDS.get(folded)
+        if command is None and len(folded) <= _INTENT_MAX_LENGTH:
+            match = self._COMMAND_KEYWORDS_RE.search(folded)
+            if match:
+                command = self._COMMANDS[match.group()]
+        return command
+
     async def _handle_image_message_async(self, event: MessageEvent) -> None:
         """Handle image message events."""
         try:
@@ -151,17 +439,15 @@ class LineBotService:
             
             logger.info(f"📷 Received image from {user_id}: {message_id}")
             
-            # Get or create user
-            bot_user = await self._get_or_create_user(user_id)
-            
-            # Send processing message
-            await self._send_processing_message(user_id)
-            
-            # Download and analyze image
-            image_data = await self._download_image(message_id)
-            analysis_result = await self._analyze_image(user_id, image_data, message_id)
+            # Acknowledge with the free reply token while the user is
+            # resolved and the image is downloaded and analyzed
+            _, _, analysis_result = await asyncio.gather(
+                self._get_or_create_user(user_id),
+                self._send_processing_message(user_id, event.reply_token),
+                self._analyze_message_image(user_id, message_id),
+            )
             
-            # Send analysis results
+            # Send analysis results with the detailed breakdown
             await self._send_analysis_results(user_id, analysis_result)
             
         except Exception as e:
@@ -174,11 +460,11 @@ class LineBotService:
             user_id = event.source.user_id
             logger.info(f"👥 New follower: {user_id}")
             
-            # Create user
-            await self._get_or_create_user(user_id)
-            
-            # Send welcome message
-            await self._send_welcome_message(user_id)
+            # Create user and send welcome message
+            await asyncio.gather(
+                self._get_or_create_user(user_id),
+                self._send_welcome_message(user_id, event.reply_token),
+            )
             
         except Exception as e:
             logger.error(f"Failed to handle follow event: {str(e)}")
@@ -197,20 +483,13 @@ class LineBotService:
 
     async def _get_or_create_user(self, line_user_id: str) -> LineBotUser:
         """Get or create LINE Bot user."""
+        cached_user = self._user_cache.get(line_user_id)
+        if cached_user is not None:
+            return cached_user
+
         try:
-            # Try to get existing user
-            response = (
-                self.supabase.table("line_bot_users")
-                .select("*")
-                .eq("line_user_id", line_user_id)
-                .single()
-                .execute()
-            )
-            
-            if response.data:
-                return LineBotUser(**response.data)
-            
-            # Create new user
+            # A single upsert returns the existing row or creates it, with
+            # the profile refreshed from LINE (cached for a day)
             profile = await self._get_user_profile(line_user_id)
             
             user_data = LineBotUserCreate(
@@ -220,47 +499,144 @@ class LineBotService:
                 status_message=profile.get("statusMessage"),
             )
             
-            response = (
-                self.supabase.table("line_bot_users")
-                .insert({
-                    "id": str(uuid4()),
-                    "line_user_id": user_data.line_user_id,
-                    "display_name": user_data.display_name,
-                    "picture_url": user_data.picture_url,
-                    "status_message": user_data.status_message,
-                    "language": user_data.language,
-                })
-                .execute()
-            )
-            
-            return LineBotUser(**response.data[0])
+            bot_user = LineBotUser(**await self._upsert_user(user_data))
+            self._user_cache.set(line_user_id, bot_user)
+            return bot_user
             
         except Exception as e:
             logger.error(f"Failed to get/create user: {str(e)}")
             raise LineBotError(f"User management failed: {str(e)}", provider="line")
 
+    async def _upsert_user(self, user_data: LineBotUserCreate) -> dict[str, Any]:
+        """Insert or refresh a LINE user row, preferring the direct database pool.
+
+        Profile fields missing from ``user_data`` (a failed profile fetch)
+        keep their stored values.
+        """
+        pool = get_pool()
+        if pool is not None:
+            record = await pool.fetchrow(
+                "INSERT INTO public.line_bot_users "
+                "(id, line_user_id, display_name, picture_url, status_message, language) "
+                "VALUES ($1, $2, $3, $4, $5, $6) "
+                "ON CONFLICT (line_user_id) DO UPDATE SET "
+                "display_name = COALESCE(EXCLUDED.display_name, line_bot_users.display_name), "
+                "picture_url = COALESCE(EXCLUDED.picture_url, line_bot_users.picture_url), "
+                "status_message = COALESCE(EXCLUDED.status_message, line_bot_users.status_message), "
+                "updated_at = now() "
+                "RETURNING *",
+                uuid4(),
+                user_data.line_user_id,
+                user_data.display_name,
+                user_data.picture_url,
+                user_data.status_message,
+                user_data.language,
+            )
+            return record_to_dict(record)
+
+        # The id is left to the column default so a conflict never rewrites it
+        row = {
+            "line_user_id": user_data.line_user_id,
+            "display_name": user_data.display_name,
+            "picture_url": user_data.picture_url,
+            "status_message": user_data.status_message,
+            "language": user_data.language,
+            "updated_at": _now_iso(),
+        }
+        response = (
+            self.supabase.table("line_bot_users")
+            .upsert(
+                {key: value for key, value in row.items() if value is not None},
+                on_conflict="line_user_id",
+            )
+            .execute()
+        )
+        return response.data[0]
+
     async def _get_user_profile(self, line_user_id: str) -> dict[str, Any]:
         """Get LINE user profile."""
+        cached_profile = self._profile_cache.get(line_user_id)
+        if cached_profile is not None:
+            return cached_profile
+
         try:
-            profile = self.line_bot_api.get_profile(line_user_id)
-            return {
-                "displayName": profile.display_name,
-                "pictureUrl": profile.picture_url,
-                "statusMessage": profile.status_message,
-            }
-        except LineBotApiError as e:
+            profile = await self.line_bot_api.get_profile(line_user_id)
+        except ApiException as e:
             logger.warning(f"Failed to get user profile: {str(e)}")
             return {}
 
+        profile_data = {
+            "displayName": profile.display_name,
+            "pictureUrl": profile.picture_url,
+            "statusMessage": profile.status_message,
+        }
+        self._profile_cache.set(line_user_id, profile_data)
+        return profile_data
+
     async def _download_image(self, message_id: str) -> bytes:
         """Download image from LINE."""
+        url = _LINE_CONTENT_URL.format(message_id=message_id)
         try:
-            message_content = self.line_bot_api.get_message_content(message_id)
-            return message_content.content
-        except LineBotApiError as e:
+            async with get_line_http_client().stream("GET", url) as response:
+                response.raise_for_status()
+
+                # Reject oversized images before reading the body
+                content_length = int(response.headers.get("Content-Length", 0))
+                if content_length > settings.max_file_size:
+                    raise FileUploadError(
+                        "Image exceeds the maximum file size",
+                        file_size=content_length,
+                    )
+
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                    buffer.extend(chunk)
+                    if len(buffer) > settings.max_file_size:
+                        raise FileUploadError(
+                            "Image exceeds the maximum file size",
+                            file_size=len(buffer),
+                        )
+                return bytes(buffer)
+        except httpx.HTTPError as e:
             logger.error(f"Failed to download image: {str(e)}")
             raise LineBotError(f"Image download failed: {str(e)}", provider="line")
 
+    async def _analyze_message_image(
+        self, user_id: str, message_id: str
+    ) -> dict[str, Any]:
+        """Download and analyze a LINE image once per message id.
+
+        Redelivered or repeated events for the same message share the
+        in-flight analysis, or reuse its result for an hour afterwards.
+        """
+        cached_result = self._analysis_results.get(message_id)
+        if cached_result is not None:
+            return cached_result
+
+        task = self._analysis_tasks.get(message_id)
+        if task is None:
+            task = asyncio.create_task(
+                self._download_and_analyze(user_id, message_id)
+            )
+            self._analysis_tasks[message_id] = task
+            task.add_done_callback(
+                lambda _: self._analysis_tasks.pop(message_id, None)
+            )
+        else:
+            logger.info(f"♻️ Joining in-flight analysis for message {message_id}")
+
+        # Shield so one cancelled waiter does not cancel the shared analysis
+        result = await asyncio.shield(task)
+        self._analysis_results.set(message_id, result)
+        return result
+
+    async def _download_and_analyze(
+        self, user_id: str, message_id: str
+    ) -> dict[str, Any]:
+        """Download a LINE image and analyze it."""
+        image_data = await self._download_image(message_id)
+        return await self._analyze_image(user_id, image_data, message_id)
+
     async def _analyze_image(self, user_id: str, image_data: bytes, message_id: str) -> dict[str, Any]:
         """Analyze image using analysis service."""
         try:
@@ -278,119 +654,44 @@ class LineBotService:
             logger.error(f"Analysis failed: {str(e)}")
             raise LineBotError(f"Analysis failed: {str(e)}", provider="analysis")
 
-    async def _send_welcome_message(self, user_id: str) -> None:
-        """Send welcome message."""
-        welcome_text = """🌟 Face Aesthetic AI へようこそ！
-
-私はあなたの美容パートナーです ✨
-
-【できること】
-📷 顔写真の美容分析
-💬 美容相談・アドバイス
-📊 詳細レポート生成
-
-【使い方】
-1. 写真を送信 → 即座に分析
-2. 「相談」と送信 → AI美容コンサル
-3. 「ヘルプ」と送信 → 詳しい使い方
-
-まずは写真を送ってみてください！"""
-
-        quick_reply = QuickReply(items=[
-            QuickReplyButton(action=MessageAction(label="📷 写真分析", text="写真を送信してください")),
-            QuickReplyButton(action=MessageAction(label="💬 美容相談", text="相談")),
-            QuickReplyButton(action=MessageAction(label="❓ ヘルプ", text="ヘルプ")),
-        ])
-
-        await self.line_bot_api.push_message(
-            PushMessageRequest(
-                to=user_id,
-                messages=[TextMessage(text=welcome_text, quick_reply=quick_reply)]
+    async def _send_messages(
+        self, user_id: str, messages: list[Any], reply_token: str | None = None
+    ) -> None:
+        """Reply with the event's reply token when available, else push."""
+        if reply_token:
+            await self.line_bot_api.reply_message(
+                ReplyMessageRequest(reply_token=reply_token, messages=messages)
             )
-        )
-
-    async def _send_help_message(self, user_id: str) -> None:
-        """Send help message."""
-        help_text = """📖 Face Aesthetic AI 使い方ガイド
-
-【写真分析の手順】
-1. 顔全体が写った正面写真を送信
-2. AI が468点の顔面ランドマークを検出
-3. 韓国美容基準で詳細分析
-4. 美容スコアとアドバイスを提供
-
-【写真撮影のコツ】
-✅ 正面を向いて表情なし
-✅ 明るい場所で撮影
-✅ 髪で顔が隠れないように
-✅ メイクは薄めがベスト
-
-【分析項目】
-• Eライン • パーツ調和性
-• 顔の対称性 • 輪郭分析
-• Vライン • 鼻唇角
-
-【コマンド】
-- 「分析」→ 分析について
-- 「相談」→ AI美容コンサル
-- 「スタート」→ 最初から"""
-
-        await self.line_bot_api.push_message(
-            PushMessageRequest(
-                to=user_id,
-                messages=[TextMessage(text=help_text)]
+        else:
+            await self.line_bot_api.push_message(
+                PushMessageRequest(to=user_id, messages=messages)
             )
-        )
-
-    async def _send_analysis_instruction(self, user_id: str) -> None:
-        """Send analysis instruction."""
-        instruction_text = """📸 美容分析を始めましょう！
-
-以下の点にご注意ください：
-
-✨ より正確な分析のために
-• 正面を向いた写真
-• 十分な明るさ
-• 表情は自然な状態
-• 顔全体がはっきり見える
-
-📊 分析される項目
-• 総合美容スコア
-• Eライン評価
-• パーツ調和性
-• 対称性分析
-• 輪郭・Vライン
-• 詳細な改善アドバイス
 
-準備ができたら写真を送信してください 📷"""
+    async def _send_welcome_message(
+        self, user_id: str, reply_token: str | None = None
+    ) -> None:
+        """Send welcome message."""
+        await self._send_messages(user_id, _WELCOME_MESSAGES, reply_token)
 
-        quick_reply = QuickReply(items=[
-            QuickReplyButton(action=MessageAction(label="📷 写真を送信", text="写真を送信します")),
-            QuickReplyButton(action=MessageAction(label="💡 撮影のコツ", text="撮影のコツを教えて")),
-        ])
+    async def _send_help_message(
+        self, user_id: str, reply_token: str | None = None
+    ) -> None:
+        """Send help message."""
+        await self._send_messages(user_id, _HELP_MESSAGES, reply_token)
 
-        self.line_bot_api.push_message(
-            user_id,
-            TextSendMessage(text=instruction_text, quick_reply=quick_reply)
+    async def _send_analysis_instruction(
+        self, user_id: str, reply_token: str | None = None
+    ) -> None:
+        """Send analysis instruction."""
+        await self._send_messages(
+            user_id, _ANALYSIS_INSTRUCTION_MESSAGES, reply_token
         )
 
-    async def _send_processing_message(self, user_id: str) -> None:
+    async def _send_processing_message(
+        self, user_id: str, reply_token: str | None = None
+    ) -> None:
         """Send processing message."""
-        processing_text = """🔍 AI分析中です...
-
-お写真を受信しました！
-最先端のAI技術で詳細に分析しています。
-
-⏱️ 分析時間: 約30-60秒
-🧠 AI処理: 468点の顔面ランドマーク検出
-📊 評価項目: 8つの美容指標
-
-少々お待ちください ✨"""
-
-        self.line_bot_api.push_message(
-            user_id,
-            TextSendMessage(text=processing_text)
-        )
+        await self._send_messages(user_id, _PROCESSING_MESSAGES, reply_token)
 
     async def _send_analysis_results(self, user_id: str, analysis_result: dict[str, Any]) -> None:
         """Send analysis results."""
@@ -402,123 +703,96 @@ class LineBotService:
             emoji = overall_score.get("emoji", "✨")
             
             # Main result message
-            result_text = f"""🎉 分析完了！
+            lines = [f"""🎉 分析完了！
 
 {emoji} 総合スコア: {score:.1f}点
 🏆 美容レベル: {level}
 
-【詳細スコア】"""
+【詳細スコア】"""]
 
             # Add detailed scores
             detailed_scores = overall_score.get("detailed_scores", {})
-            for key, value in list(detailed_scores.items())[:5]:  # Top 5 scores
-                feature_name = self._get_feature_name(key)
-                result_text += f"\n• {feature_name}: {value:.1f}点"
+            get_name = self._get_feature_name
+            lines.extend(
+                f"• {get_name(key)}: {value:.1f}点"
+                for key, value in islice(detailed_scores.items(), 5)  # Top 5 scores
+            )
 
             # Add advice preview
             advice = analysis_result.get("beauty_advice", [])
             if advice:
-                result_text += f"\n\n💡 改善アドバイス（抜粋）\n• {advice[0][:50]}..."
+                lines.append(f"\n💡 改善アドバイス（抜粋）\n• {advice[0][:50]}...")
+            result_text = "\n".join(lines)
 
             # Quick reply options
             quick_reply = QuickReply(items=[
-                QuickReplyButton(action=MessageAction(label="💬 詳しく相談", text="この結果について相談したい")),
-                QuickReplyButton(action=MessageAction(label="📊 詳細レポート", text="詳細レポートが欲しい")),
-                QuickReplyButton(action=MessageAction(label="🔄 再分析", text="別の写真で分析")),
+                QuickReplyItem(action=MessageAction(label="💬 詳しく相談", text="この結果について相談したい")),
+                QuickReplyItem(action=MessageAction(label="📊 詳細レポート", text="詳細レポートが欲しい")),
+                QuickReplyItem(action=MessageAction(label="🔄 再分析", text="別の写真で分析")),
             ])
 
-            self.line_bot_api.push_message(
-                user_id,
-                TextSendMessage(text=result_text, quick_reply=quick_reply)
-            )
+            # One push for the summary and the carousel; LINE only shows
+            # quick replies attached to the last message
+            messages: list[Any] = [TextMessage(text=result_text)]
+            carousel_message = self._build_detailed_carousel(analysis_result)
+            if carousel_message is not None:
+                messages.append(carousel_message)
+            messages[-1].quick_reply = quick_reply
 
-            # Send carousel with detailed breakdown
-            await self._send_detailed_carousel(user_id, analysis_result)
+            await self._send_messages(user_id, messages)
 
         except Exception as e:
             logger.error(f"Failed to send analysis results: {str(e)}")
             await self._send_error_message(user_id)
 
-    async def _send_detailed_carousel(self, user_id: str, analysis_result: dict[str, Any]) -> None:
-        """Send detailed analysis carousel."""
+    def _build_detailed_carousel(
+        self, analysis_result: dict[str, Any]
+    ) -> TemplateMessage | None:
+        """Build the detailed analysis carousel, or None if it cannot be built."""
         try:
             columns = []
             
             # Overall Score Card
             overall_score = analysis_result.get("overall_score", {})
             columns.append(CarouselColumn(
-                thumbnail_image_url="https://example.com/overall-score.jpg",  # Replace with actual image
+                thumbnail_image_url=_OVERALL_CARD_THUMBNAIL,
                 title=f"総合スコア {overall_score.get('score', 0):.1f}点",
                 text=f"{overall_score.get('emoji', '✨')} {overall_score.get('level', '')}",
-                actions=[
-                    MessageAction(label="詳しく見る", text="総合スコアについて教えて"),
-                    URIAction(label="Webで確認", uri="https://your-domain.com/analysis")  # Replace with actual URL
-                ]
+                actions=_OVERALL_CARD_ACTIONS,
             ))
 
             # Feature cards
-            features = [
-                ("eline", "Eライン", "💋"),
-                ("facial_harmony", "パーツ調和", "🌟"),
-                ("symmetry", "対称性", "⚖️"),
-                ("vline", "Vライン", "✨")
-            ]
-
-            for feature_key, feature_name, emoji in features[:3]:  # Limit to 3 more cards
-                feature_data = analysis_result.get(f"{feature_key}_analysis", 
-                                                 analysis_result.get(feature_key, {}))
+            for feature in _CAROUSEL_FEATURES:
+                feature_data = analysis_result.get(
+                    feature.analysis_key, analysis_result.get(feature.key, {})
+                )
                 
                 if feature_data:
                     score = self._extract_score(feature_data)
                     evaluation = feature_data.get("evaluation", "分析中")
                     
                     columns.append(CarouselColumn(
-                        thumbnail_image_url=f"https://example.com/{feature_key}.jpg",  # Replace with actual images
-                        title=f"{emoji} {feature_name}",
+                        thumbnail_image_url=feature.thumbnail_url,
+                        title=feature.title,
                         text=f"スコア: {score:.1f}点\n{evaluation}",
-                        actions=[
-                            MessageAction(label="詳細", text=f"{feature_name}について詳しく教えて"),
-                            MessageAction(label="改善方法", text=f"{feature_name}の改善方法は？")
-                        ]
+                        actions=feature.actions,
                     ))
 
-            if columns:
-                carousel_template = CarouselTemplate(columns=columns)
-                template_message = TemplateSendMessage(
-                    alt_text="詳細分析結果",
-                    template=carousel_template
-                )
-                
-                self.line_bot_api.push_message(user_id, template_message)
+            carousel_template = CarouselTemplate(columns=columns)
+            return TemplateMessage(
+                alt_text="詳細分析結果",
+                template=carousel_template
+            )
 
         except Exception as e:
-            logger.error(f"Failed to send carousel: {str(e)}")
+            logger.error(f"Failed to build carousel: {str(e)}")
+            return None
 
-    async def _handle_chat_request(self, user_id: str, message: str) -> None:
+    async def _handle_chat_request(
+        self, user_id: str, reply_token: str | None = None
+    ) -> None:
         """Handle chat consultation request."""
-        chat_text = """💬 AI美容コンサルテーション
-
-韓国美容のプロフェッショナルAIがあなたの美容に関する質問にお答えします！
-
-【相談できること】
-• 分析結果の詳しい説明
-• 具体的な改善方法
-• おすすめコスメ・スキンケア
-• メイクテクニック
-• K-Beauty トレンド
-
-どんなことでもお気軽にご質問ください ✨"""
-
-        quick_reply = QuickReply(items=[
-            QuickReplyButton(action=MessageAction(label="分析結果について", text="分析結果について詳しく教えて")),
-            QuickReplyButton(action=MessageAction(label="改善方法", text="美容改善の具体的な方法は？")),
-            QuickReplyButton(action=MessageAction(label="韓国コスメ", text="おすすめの韓国コスメを教えて")),
-        ])
-
-        self.line_bot_api.push_message(
-            user_id,
-            TextSendMessage(text=chat_text, quick_reply=quick_reply)
-        )
+        await self._send_messages(user_id, _CHAT_INTRO_MESSAGES, reply_token)
 
     async def _handle_chat_message(self, user_id: str, message: str) -> None:
         """Handle chat message with AI."""
@@ -558,45 +832,36 @@ class LineBotService:
         for suggestion in suggestions[:3]:  # Limit to 3 suggestions
             if len(suggestion) <= 20:  # LINE quick reply label limit
                 quick_reply_items.append(
-                    QuickReplyButton(action=MessageAction(label=suggestion, text=suggestion))
+                    QuickReplyItem(action=MessageAction(label=suggestion, text=suggestion))
                 )
 
         quick_reply = QuickReply(items=quick_reply_items) if quick_reply_items else None
 
-        self.line_bot_api.push_message(
-            user_id,
-            TextSendMessage(text=response_text, quick_reply=quick_reply)
+        await self._send_messages(
+            user_id, [TextMessage(text=response_text, quick_reply=quick_reply)]
         )
 
     async def _send_error_message(self, user_id: str) -> None:
         """Send error message."""
-        error_text = """😅 申し訳ございません
-
-一時的な問題が発生しました。
-しばらく時間をおいてから再度お試しください。
-
-📞 サポートが必要な場合
-• 「ヘルプ」と送信
-• Webサイトでお問い合わせ
-
-ご不便をおかけして申し訳ありません 🙏"""
-
-        quick_reply = QuickReply(items=[
-            QuickReplyButton(action=MessageAction(label="🔄 再試行", text="もう一度")),
-            QuickReplyButton(action=MessageAction(label="❓ ヘルプ", text="ヘルプ")),
-        ])
-
-        self.line_bot_api.push_message(
-            user_id,
-            TextSendMessage(text=error_text, quick_reply=quick_reply)
-        )
+        await self._send_messages(user_id, _ERROR_MESSAGES)
 
     async def _deactivate_user(self, line_user_id: str) -> None:
         """Deactivate LINE user."""
+        self._user_cache.delete(line_user_id)
         try:
+            pool = get_pool()
+            if pool is not None:
+                await pool.execute(
+                    "UPDATE public.line_bot_users "
+                    "SET is_active = false, updated_at = now() "
+                    "WHERE line_user_id = $1",
+                    line_user_id,
+                )
+                return
+
             self.supabase.table("line_bot_users").update({
                 "is_active": False,
-                "updated_at": datetime.now().isoformat()
+                "updated_at": _now_iso()
             }).eq("line_user_id", line_user_id).execute()
             
         except Exception as e:
@@ -604,18 +869,7 @@ class LineBotService:
 
     def _get_feature_name(self, key: str) -> str:
         """Get Japanese feature name."""
-        feature_names = {
-            "eline": "Eライン",
-            "harmony": "パーツ調和",
-            "symmetry": "対称性",
-            "proportions": "顔の比率",
-            "vline": "Vライン",
-            "nasolabial": "鼻唇角",
-            "dental": "歯列・唇",
-            "contour": "輪郭",
-            "philtrum_chin": "人中・顎",
-        }
-        return feature_names.get(key, key)
+        return _FEATURE_NAMES.get(key, key)
 
     def _extract_score(self, data: dict[str, Any]) -> float:
         """Extract score from analysis data."""
@@ -623,24 +877,49 @@ class LineBotService:
             return float(data["score"])
         elif "evaluation" in data:
             evaluation = data["evaluation"].lower()
-            if "理想" in evaluation or "優秀" in evaluation:
-                return 90.0
-            elif "良好" in evaluation:
-                return 80.0
-            elif "標準" in evaluation:
-                return 70.0
-            else:
-                return 60.0
+            for keywords, score in _EVALUATION_SCORES:
+                if any(keyword in evaluation for keyword in keywords):
+                    return score
+            return 60.0
         return 70.0
 
 
-# Global service instance
-_linebot_service_instance: LineBotService | None = None
+# Last formatted timestamp and when it was taken (monotonic seconds)
+_last_iso: tuple[float, str] = (float("-inf"), "")
+
+
+def _now_iso() -> str:
+    """Current UTC time as ISO 8601, reformatted at most once a second."""
+    global _last_iso
+
+    now = time.monotonic()
+    if now - _last_iso[0] >= 1:
+        _last_iso = (now, datetime.now(UTC).isoformat())
+    return _last_iso[1]
+
+
+@functools.lru_cache(maxsize=1)
+def get_line_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive HTTP client for LINE content downloads."""
+    return httpx.AsyncClient(
+        http2=True,
+        headers={"Authorization": f"Bearer {settings.line_channel_access_token}"},
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(10.0, connect=3.0),
+    )
+
+
+async def close_linebot_clients() -> None:
+    """Close pooled LINE connections (call on shutdown)."""
+    for service in list(_linebot_services):
+        await service.drain_events(_SHUTDOWN_DRAIN_TIMEOUT)
+        await service.async_api_client.close()
+    if get_line_http_client.cache_info().currsize:
+        await get_line_http_client().aclose()
+        get_line_http_client.cache_clear()
 
 
+@functools.lru_cache(maxsize=8)
 def get_linebot_service(supabase_client: Client) -> LineBotService:
-    """Get or create LINE Bot service instance."""
-    global _linebot_service_instance
-    if _linebot_service_instance is None:
-        _linebot_service_instance = LineBotService(supabase_client)
-    return _linebot_service_instance
\ No newline at end of file
+    """Get or create LINE Bot service instance for a Supabase client."""
+    return LineBotService(supabase_client)
\ No newline at end of file
@@ -1,13 +1,38 @@
 """Storage service for handling Supabase Storage operations."""
 
 import asyncio
+import functools
+import hashlib
+from collections import defaultdict
 from datetime import datetime, timedelta
 from uuid import UUID, uuid4
 
+import httpx
 from loguru import logger
 from supabase import Client
 
+from app.config import settings
 from app.utils.exceptions import FileUploadError
+from app.utils.write_queue import BatchWriteQueue
+
+# Marker preceding "{bucket}/{path}" in Supabase public object URLs
+_PUBLIC_URL_MARKER = "/storage/v1/object/public/"
+
+# Storage bucket per image type
+_BUCKET_NAMES = {
+    "analysis": "user-images",
+    "report": "report-images",
+    "avatar": "avatars",
+    "temp": "user-images",
+}
+
+# MIME type per lowercase file extension
+_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
 
 
 class StorageService:
@@ -16,6 +41,10 @@ class StorageService:
     def __init__(self, supabase_client: Client) -> None:
         """Initialize storage service."""
         self.supabase = supabase_client
+        self._public_base = settings.supabase_url.rstrip("/") + _PUBLIC_URL_MARKER
+        self.metadata_writer = BatchWriteQueue(
+            supabase_client, "stored_images", flush_interval=0.05, max_batch=200
+        )
 
     async def upload_image(
         self,
@@ -23,43 +52,60 @@ class StorageService:
         image_data: bytes,
         filename: str,
         image_type: str = "analysis",
+        mime_type: str | None = None,
     ) -> str:
         """Upload image to Supabase Storage and return URL."""
+        size = len(image_data)
+
         try:
             # Determine bucket based on image type
             bucket_name = self._get_bucket_name(image_type)
-            
+
+            image_hash = hashlib.sha256(image_data).hexdigest()
+
+            # Reuse an identical object this user already stored
+            if image_type != "temp":
+                existing_url = await self._find_duplicate(
+                    user_id, image_hash, image_type
+                )
+                if existing_url:
+                    logger.info(f"♻️ Reusing stored image {existing_url}")
+                    return existing_url
+
             # Generate unique file path
             file_extension = self._get_file_extension(filename)
+            content_type = mime_type or self._get_mime_type(file_extension)
             unique_filename = f"{uuid4()}{file_extension}"
             file_path = f"{user_id}/{unique_filename}"
 
             logger.info(f"📤 Uploading image to {bucket_name}/{file_path}")
 
-            # Upload to Supabase Storage
-            response = self.supabase.storage.from_(bucket_name).upload(
-                file_path, image_data, {"content-type": self._get_mime_type(file_extension)}
+            # POST straight to the Storage API over the pooled client
+            response = await get_storage_http_client().post(
+                f"/object/{bucket_name}/{file_path}",
+                content=image_data,
+                headers={"content-type": content_type},
             )
-
-            if hasattr(response, 'error') and response.error:
+            if response.is_error:
                 raise FileUploadError(
-                    f"Storage upload failed: {response.error}",
+                    f"Storage upload failed: {response.text}",
                     filename=filename,
-                    file_size=len(image_data),
+                    file_size=size,
                 )
 
-            # Get public URL
-            public_url = self.supabase.storage.from_(bucket_name).get_public_url(file_path)
+            public_url = self._public_url(bucket_name, file_path)
 
-            # Store metadata in database
-            await self._store_image_metadata(
+            # Queue metadata for a batched write off the upload path
+            self._store_image_metadata(
                 user_id=user_id,
                 original_filename=filename,
                 storage_path=file_path,
                 storage_bucket=bucket_name,
-                file_size=len(image_data),
+                file_size=size,
                 image_type=image_type,
+                mime_type=content_type,
                 public_url=public_url,
+                image_hash=image_hash,
             )
 
             logger.info(f"✅ Image uploaded successfully: {public_url}")
@@ -70,31 +116,45 @@ class StorageService:
             raise FileUploadError(
                 f"Failed to upload image: {str(e)}",
                 filename=filename,
-                file_size=len(image_data),
+                file_size=size,
             ) from e
 
     async def delete_image_by_url(self, image_url: str) -> None:
         """Delete image by URL."""
         try:
-            # Extract path from URL
-            # Format: https://project.supabase.co/storage/v1/object/public/bucket/path
-            url_parts = image_url.split("/")
-            if len(url_parts) < 3:
-                raise FileUploadError("Invalid image URL format")
-
-            bucket_name = url_parts[-2]
-            file_path = url_parts[-1]
+            bucket_name, file_path = _parse_public_url(image_url)
+
+            # Deduplicated uploads may share one object between analyses,
+            # as either the original or the report of any of them
+            referenced = await asyncio.to_thread(
+                self.supabase.table("analysis_results")
+                .select("id")
+                .or_(
+                    f'original_image_url.eq."{image_url}",'
+                    f'report_image_url.eq."{image_url}"'
+                )
+                .limit(1)
+                .execute
+            )
+            if referenced.data:
+                logger.info(f"Image still referenced, keeping {image_url}")
+                return
 
             # Delete from storage
-            response = self.supabase.storage.from_(bucket_name).remove([file_path])
+            response = await asyncio.to_thread(
+                self.supabase.storage.from_(bucket_name).remove, [file_path]
+            )
 
             if hasattr(response, 'error') and response.error:
                 logger.warning(f"Storage deletion warning: {response.error}")
 
             # Remove metadata from database
-            self.supabase.table("stored_images").delete().eq(
-                "storage_path", file_path
-            ).execute()
+            await asyncio.to_thread(
+                self.supabase.table("stored_images")
+                .delete()
+                .eq("storage_path", file_path)
+                .execute
+            )
 
             logger.info(f"🗑️ Image deleted: {image_url}")
 
@@ -105,15 +165,14 @@ class StorageService:
     async def get_image_metadata(self, image_url: str) -> dict | None:
         """Get image metadata from database."""
         try:
-            url_parts = image_url.split("/")
-            file_path = url_parts[-1]
+            _, file_path = _parse_public_url(image_url)
 
-            response = (
+            response = await asyncio.to_thread(
                 self.supabase.table("stored_images")
                 .select("*")
                 .eq("storage_path", file_path)
                 .single()
-                .execute()
+                .execute
             )
 
             return response.data
@@ -126,12 +185,12 @@ class StorageService:
         """Clean up expired temporary images."""
         try:
             # Find expired images
-            response = (
+            response = await asyncio.to_thread(
                 self.supabase.table("stored_images")
                 .select("*")
                 .eq("is_temporary", True)
                 .lt("expires_at", datetime.now().isoformat())
-                .execute()
+                .execute
             )
 
             expired_images = response.data
@@ -140,25 +199,48 @@ class StorageService:
 
             logger.info(f"🧹 Cleaning up {len(expired_images)} expired images")
 
+            # Group files by bucket so each bucket is cleared in one call
+            by_bucket: dict[str, list[tuple[str, str]]] = defaultdict(list)
             for image in expired_images:
-                try:
-                    # Delete from storage
-                    self.supabase.storage.from_(image["storage_bucket"]).remove(
-                        [image["storage_path"]]
-                    )
+                by_bucket[image["storage_bucket"]].append(
+                    (image["id"], image["storage_path"])
+                )
 
-                    # Delete metadata
-                    self.supabase.table("stored_images").delete().eq(
-                        "id", image["id"]
-                    ).execute()
+            # Delete from storage, one request per bucket in parallel
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        self.supabase.storage.from_(bucket).remove,
+                        [path for _, path in items],
+                    )
+                    for bucket, items in by_bucket.items()
+                ),
+                return_exceptions=True,
+            )
 
-                except Exception as e:
-                    logger.error(f"Failed to delete expired image {image['id']}: {str(e)}")
+            # Delete metadata only for images whose files were removed
+            removed_ids: list[str] = []
+            for (bucket, items), result in zip(by_bucket.items(), results, strict=True):
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"Failed to delete {len(items)} expired images "
+                        f"from {bucket}: {str(result)}"
+                    )
+                else:
+                    removed_ids.extend(image_id for image_id, _ in items)
+
+            if removed_ids:
+                await asyncio.to_thread(
+                    self.supabase.table("stored_images")
+                    .delete()
+                    .in_("id", removed_ids)
+                    .execute
+                )
 
         except Exception as e:
             logger.error(f"Failed to cleanup expired images: {str(e)}")
 
-    async def _store_image_metadata(
+    def _store_image_metadata(
         self,
         user_id: UUID,
         original_filename: str,
@@ -166,57 +248,104 @@ class StorageService:
         storage_bucket: str,
         file_size: int,
         image_type: str,
+        mime_type: str,
         public_url: str,
+        image_hash: str | None = None,
     ) -> None:
-        """Store image metadata in database."""
+        """Queue image metadata for a batched database insert."""
+        # Write failures are logged by the queue and never fail the upload
+        self.metadata_writer.put({
+            "user_id": str(user_id),
+            "original_filename": original_filename,
+            "storage_path": storage_path,
+            "storage_bucket": storage_bucket,
+            "file_size_bytes": file_size,
+            "mime_type": mime_type,
+            "image_type": image_type,
+            "image_hash": image_hash,
+            "is_temporary": image_type == "temp",
+            "expires_at": (
+                datetime.now() + timedelta(hours=24)
+                if image_type == "temp"
+                else None
+            ),
+        })
+
+    async def _find_duplicate(
+        self, user_id: UUID, image_hash: str, image_type: str
+    ) -> str | None:
+        """Return the URL of an identical image the user already stored."""
         try:
-            metadata = {
-                "user_id": str(user_id),
-                "original_filename": original_filename,
-                "storage_path": storage_path,
-                "storage_bucket": storage_bucket,
-                "file_size_bytes": file_size,
-                "mime_type": self._get_mime_type(self._get_file_extension(original_filename)),
-                "image_type": image_type,
-                "is_temporary": image_type == "temp",
-                "expires_at": (
-                    datetime.now() + timedelta(hours=24)
-                    if image_type == "temp"
-                    else None
-                ),
-            }
+            response = await asyncio.to_thread(
+                self.supabase.table("stored_images")
+                .select("storage_bucket, storage_path")
+                .eq("user_id", str(user_id))
+                .eq("image_hash", image_hash)
+                .eq("image_type", image_type)
+                .limit(1)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"Duplicate image lookup failed: {str(e)}")
+            return None
 
-            self.supabase.table("stored_images").insert(metadata).execute()
+        if not response.data:
+            return None
+        row = response.data[0]
+        return self._public_url(row["storage_bucket"], row["storage_path"])
 
-        except Exception as e:
-            logger.error(f"Failed to store image metadata: {str(e)}")
-            # Don't raise to avoid failing the entire upload
+    def _public_url(self, bucket_name: str, file_path: str) -> str:
+        """Build a public object URL locally from its bucket and path."""
+        return f"{self._public_base}{bucket_name}/{file_path}"
 
     def _get_bucket_name(self, image_type: str) -> str:
         """Get appropriate bucket name for image type."""
-        bucket_map = {
-            "analysis": "user-images",
-            "report": "report-images",
-            "avatar": "avatars",
-            "temp": "user-images",
-        }
-        return bucket_map.get(image_type, "user-images")
+        return _BUCKET_NAMES.get(image_type, "user-images")
 
     def _get_file_extension(self, filename: str) -> str:
         """Extract file extension from filename."""
-        if "." in filename:
-            return "." + filename.split(".")[-1].lower()
+        _, dot, extension = filename.rpartition(".")
+        if dot:
+            return "." + extension.lower()
         return ".jpg"  # Default extension
 
     def _get_mime_type(self, file_extension: str) -> str:
         """Get MIME type from file extension."""
-        mime_map = {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg", 
-            ".png": "image/png",
-            ".webp": "image/webp",
-        }
-        return mime_map.get(file_extension.lower(), "image/jpeg")
+        return _MIME_TYPES.get(file_extension.lower(), "image/jpeg")
+
+
+def _parse_public_url(image_url: str) -> tuple[str, str]:
+    """Split a public object URL into its bucket and storage path."""
+    # Format: https://project.supabase.co/storage/v1/object/public/bucket/path
+    _, marker, rest = image_url.partition(_PUBLIC_URL_MARKER)
+    bucket_name, _, file_path = rest.partition("?")[0].partition("/")
+    if not marker or not bucket_name or not file_path:
+        raise FileUploadError("Invalid image URL format")
+    return bucket_name, file_path
+
+
+@functools.lru_cache(maxsize=1)
+def get_storage_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive HTTP client for the Supabase Storage API."""
+    return httpx.AsyncClient(
+        base_url=f"{settings.supabase_url}/storage/v1",
+        headers={
+            "apikey": settings.supabase_service_key,
+            "Authorization": f"Bearer {settings.supabase_service_key}",
+        },
+        timeout=httpx.Timeout(30.0, connect=3.0),
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0
+        ),
+    )
+
+
+async def close_storage_clients() -> None:
+    """Close pooled Storage connections (call on shutdown)."""
+    if get_storage_http_client.cache_info().currsize:
+        await get_storage_http_client().aclose()
+        get_storage_http_client.cache_clear()
 
 
 # Global service instance
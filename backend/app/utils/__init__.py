@@ -7,8 +7,12 @@ from .exceptions import (
     FileUploadError,
     ValidationError,
 )
-from .image_processing import ImageProcessor
+from .image_processing import ImageInfo, ImageProcessor
+from .rate_limiter import RateLimiter
+from .semantic_cache import SemanticCache
+from .ttl_cache import TTLCache
 from .validators import AnalysisValidator, ImageValidator, UserValidator
+from .write_queue import BatchWriteQueue
 
 __all__ = [
     # Exceptions
@@ -18,7 +22,13 @@ __all__ = [
     "FileUploadError",
     "ValidationError",
     # Image processing
+    "ImageInfo",
     "ImageProcessor",
+    # Caching and rate limiting
+    "RateLimiter",
+    "SemanticCache",
+    "TTLCache",
+    "BatchWriteQueue",
     # Validators
     "AnalysisValidator",
     "ImageValidator",
@@ -10,6 +10,8 @@ from loguru import logger
 class FaceAestheticError(Exception):
     """Base exception for Face Aesthetic API."""
 
+    error_code: str = "FaceAestheticError"
+
     def __init__(
         self,
         message: str,
@@ -17,7 +19,8 @@ class FaceAestheticError(Exception):
         details: dict[str, Any] | None = None,
     ) -> None:
         self.message = message
-        self.error_code = error_code or self.__class__.__name__
+        if error_code is not None:
+            self.error_code = error_code
         self.details = details or {}
         super().__init__(self.message)
 
@@ -25,6 +28,8 @@ class FaceAestheticError(Exception):
 class ValidationError(FaceAestheticError):
     """Validation error exception."""
 
+    error_code = "VALIDATION_ERROR"
+
     def __init__(
         self,
         message: str = "Validation failed",
@@ -37,23 +42,27 @@ class ValidationError(FaceAestheticError):
             details["field"] = field
         if value is not None:
             details["value"] = value
-        super().__init__(message, "VALIDATION_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class AuthenticationError(FaceAestheticError):
     """Authentication error exception."""
 
+    error_code = "AUTHENTICATION_ERROR"
+
     def __init__(
         self,
         message: str = "Authentication failed",
         **kwargs: Any,
     ) -> None:
-        super().__init__(message, "AUTHENTICATION_ERROR", kwargs.get("details"))
+        super().__init__(message, details=kwargs.get("details"))
 
 
 class AuthorizationError(FaceAestheticError):
     """Authorization error exception."""
 
+    error_code = "AUTHORIZATION_ERROR"
+
     def __init__(
         self,
         message: str = "Authorization failed",
@@ -63,12 +72,14 @@ class AuthorizationError(FaceAestheticError):
         details = kwargs.get("details", {})
         if required_permission:
             details["required_permission"] = required_permission
-        super().__init__(message, "AUTHORIZATION_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class FileUploadError(FaceAestheticError):
     """File upload error exception."""
 
+    error_code = "FILE_UPLOAD_ERROR"
+
     def __init__(
         self,
         message: str = "File upload failed",
@@ -81,12 +92,14 @@ class FileUploadError(FaceAestheticError):
             details["filename"] = filename
         if file_size:
             details["file_size"] = file_size
-        super().__init__(message, "FILE_UPLOAD_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class AnalysisError(FaceAestheticError):
     """Face analysis error exception."""
 
+    error_code = "ANALYSIS_ERROR"
+
     def __init__(
         self,
         message: str = "Face analysis failed",
@@ -96,12 +109,14 @@ class AnalysisError(FaceAestheticError):
         details = kwargs.get("details", {})
         if stage:
             details["analysis_stage"] = stage
-        super().__init__(message, "ANALYSIS_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class ChatbotError(FaceAestheticError):
     """Chatbot service error exception."""
 
+    error_code = "CHATBOT_ERROR"
+
     def __init__(
         self,
         message: str = "Chatbot service failed",
@@ -111,12 +126,31 @@ class ChatbotError(FaceAestheticError):
         details = kwargs.get("details", {})
         if provider:
             details["provider"] = provider
-        super().__init__(message, "CHATBOT_ERROR", details)
+        super().__init__(message, details=details)
+
+
+class LineBotError(FaceAestheticError):
+    """LINE Bot service error exception."""
+
+    error_code = "LINEBOT_ERROR"
+
+    def __init__(
+        self,
+        message: str = "LINE Bot service failed",
+        provider: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        details = kwargs.get("details", {})
+        if provider:
+            details["provider"] = provider
+        super().__init__(message, details=details)
 
 
 class ExternalServiceError(FaceAestheticError):
     """External service error exception."""
 
+    error_code = "EXTERNAL_SERVICE_ERROR"
+
     def __init__(
         self,
         message: str = "External service error",
@@ -129,12 +163,14 @@ class ExternalServiceError(FaceAestheticError):
             details["service"] = service
         if status_code:
             details["status_code"] = status_code
-        super().__init__(message, "EXTERNAL_SERVICE_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class DatabaseError(FaceAestheticError):
     """Database operation error exception."""
 
+    error_code = "DATABASE_ERROR"
+
     def __init__(
         self,
         message: str = "Database operation failed",
@@ -144,12 +180,14 @@ class DatabaseError(FaceAestheticError):
         details = kwargs.get("details", {})
         if operation:
             details["operation"] = operation
-        super().__init__(message, "DATABASE_ERROR", details)
+        super().__init__(message, details=details)
 
 
 class RateLimitError(FaceAestheticError):
     """Rate limit exceeded error exception."""
 
+    error_code = "RATE_LIMIT_ERROR"
+
     def __init__(
         self,
         message: str = "Rate limit exceeded",
@@ -162,7 +200,22 @@ class RateLimitError(FaceAestheticError):
             details["limit"] = limit
         if reset_time:
             details["reset_time"] = reset_time
-        super().__init__(message, "RATE_LIMIT_ERROR", details)
+        super().__init__(message, details=details)
+
+
+# HTTP status code per error type
+_STATUS_CODES: dict[type[FaceAestheticError], int] = {
+    ValidationError: status.HTTP_422_UNPROCESSABLE_ENTITY,
+    AuthenticationError: status.HTTP_401_UNAUTHORIZED,
+    AuthorizationError: status.HTTP_403_FORBIDDEN,
+    FileUploadError: status.HTTP_400_BAD_REQUEST,
+    AnalysisError: status.HTTP_422_UNPROCESSABLE_ENTITY,
+    ChatbotError: status.HTTP_503_SERVICE_UNAVAILABLE,
+    LineBotError: status.HTTP_503_SERVICE_UNAVAILABLE,
+    ExternalServiceError: status.HTTP_503_SERVICE_UNAVAILABLE,
+    DatabaseError: status.HTTP_500_INTERNAL_SERVER_ERROR,
+    RateLimitError: status.HTTP_429_TOO_MANY_REQUESTS,
+}
 
 
 def setup_exception_handlers(app: FastAPI) -> None:
@@ -176,20 +229,8 @@ def setup_exception_handlers(app: FastAPI) -> None:
         logger.error(f"Face Aesthetic Error: {exc.message} - Details: {exc.details}")
 
         # Determine HTTP status code based on error type
-        status_code_map = {
-            "VALIDATION_ERROR": status.HTTP_422_UNPROCESSABLE_ENTITY,
-            "AUTHENTICATION_ERROR": status.HTTP_401_UNAUTHORIZED,
-            "AUTHORIZATION_ERROR": status.HTTP_403_FORBIDDEN,
-            "FILE_UPLOAD_ERROR": status.HTTP_400_BAD_REQUEST,
-            "ANALYSIS_ERROR": status.HTTP_422_UNPROCESSABLE_ENTITY,
-            "CHATBOT_ERROR": status.HTTP_503_SERVICE_UNAVAILABLE,
-            "EXTERNAL_SERVICE_ERROR": status.HTTP_503_SERVICE_UNAVAILABLE,
-            "DATABASE_ERROR": status.HTTP_500_INTERNAL_SERVER_ERROR,
-            "RATE_LIMIT_ERROR": status.HTTP_429_TOO_MANY_REQUESTS,
-        }
-
-        status_code = status_code_map.get(
-            exc.error_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        status_code = _STATUS_CODES.get(
+            type(exc), status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
         return JSONResponse(
@@ -1,6 +1,8 @@
 """Image processing utilities."""
 
 import io
+import struct
+from dataclasses import dataclass
 from typing import Tuple
 
 import cv2
@@ -9,27 +11,101 @@ from PIL import Image
 
 from app.utils.exceptions import ValidationError
 
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Decode-to-RGB flag (OpenCV 4.11+), None on older builds
+_IMREAD_COLOR_RGB = getattr(cv2, "IMREAD_COLOR_RGB", None)
+
+# Reduced JPEG decodes, largest reduction first
+_JPEG_REDUCED_READS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# OpenCV encoder settings matching the PIL fallback below
+_OPENCV_ENCODINGS = {
+    "JPEG": (".jpg", [
+        cv2.IMWRITE_JPEG_QUALITY, 85,
+        cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+        cv2.IMWRITE_JPEG_PROGRESSIVE, 1,
+        cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+    ]),
+    "PNG": (".png", []),
+    "WEBP": (".webp", [cv2.IMWRITE_WEBP_QUALITY, 85]),
+}
+
+# PIL encoder settings: 4:2:0 progressive JPEG, slowest/smallest WebP
+_PIL_SAVE_OPTIONS = {
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True, "subsampling": 2},
+    "PNG": {},
+    "WEBP": {"quality": 85, "method": 6},
+}
+
+_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ImageInfo:
+    """Format, dimensions and MIME type read from an image header.
+
+    ``mime`` is None for formats other than JPEG, PNG and WebP.
+    """
+
+    format: str
+    width: int
+    height: int
+    mime: str | None
+
 
 class ImageProcessor:
     """Utility class for image processing operations."""
 
     @staticmethod
-    def validate_image_data(image_data: bytes) -> Tuple[bool, str]:
+    def probe(image_data: bytes) -> ImageInfo:
+        """Read image format and size in one header pass, falling back to PIL."""
+        probe = ImageProcessor._probe(image_data)
+        if probe is not None:
+            image_format, width, height = probe
+        else:
+            try:
+                image = Image.open(io.BytesIO(image_data))
+                image.verify()
+            except Exception as e:
+                raise ValidationError(f"Cannot read image: {str(e)}") from e
+            image_format, (width, height) = image.format, image.size
+        return ImageInfo(
+            format=image_format,
+            width=width,
+            height=height,
+            mime=_MIME_TYPES.get(image_format),
+        )
+
+    @staticmethod
+    def validate_image_data(
+        image_data: bytes, info: ImageInfo | None = None
+    ) -> Tuple[bool, str]:
         """Validate image data format and readability."""
         try:
-            # Try to open with PIL
-            image = Image.open(io.BytesIO(image_data))
-            image.verify()
+            if info is None:
+                info = ImageProcessor.probe(image_data)
             
             # Check format
-            if image.format not in ['JPEG', 'PNG', 'WEBP']:
-                return False, f"Unsupported format: {image.format}"
+            if info.format not in _MIME_TYPES:
+                return False, f"Unsupported format: {info.format}"
             
             # Check dimensions
-            if image.size[0] < 100 or image.size[1] < 100:
+            if info.width < 100 or info.height < 100:
                 return False, "Image too small (minimum 100x100)"
             
-            if image.size[0] > 4000 or image.size[1] > 4000:
+            if info.width > 4000 or info.height > 4000:
                 return False, "Image too large (maximum 4000x4000)"
             
             return True, "Valid image"
@@ -59,6 +135,14 @@ class ImageProcessor:
             # Convert bytes to numpy array
             nparr = np.frombuffer(image_data, np.uint8)
             
+            # Decode straight to RGB (MediaPipe expects RGB) where OpenCV
+            # supports it, saving a full-frame color conversion pass
+            if _IMREAD_COLOR_RGB is not None:
+                image_rgb = cv2.imdecode(nparr, _IMREAD_COLOR_RGB)
+                if image_rgb is None:
+                    raise ValidationError("Cannot decode image")
+                return image_rgb
+
             # Decode image
             image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
@@ -74,9 +158,30 @@ class ImageProcessor:
             raise ValidationError(f"Cannot prepare image for analysis: {str(e)}")
 
     @staticmethod
-    def resize_if_needed(image_data: bytes, max_dimension: int = 1024) -> bytes:
-        """Resize image if it's too large, maintaining aspect ratio."""
+    def resize_if_needed(
+        image_data: bytes, max_dimension: int = 1024, image_type: str = "analysis"
+    ) -> bytes:
+        """Resize image if it's too large, maintaining aspect ratio.
+
+        Analysis images are re-encoded as JPEG since they never need alpha.
+        """
         try:
+            # Fast path: check the header, then downscale with OpenCV
+            probe = ImageProcessor._probe(image_data)
+            if probe is not None:
+                image_format, width, height = probe
+                if max(width, height) <= max_dimension:
+                    return image_data
+                resized_data = ImageProcessor._resize_with_opencv(
+                    image_data,
+                    image_format,
+                    "JPEG" if image_type == "analysis" else image_format,
+                    max(width, height),
+                    max_dimension,
+                )
+                if resized_data is not None:
+                    return resized_data
+
             image = Image.open(io.BytesIO(image_data))
             
             # Check if resize is needed
@@ -92,24 +197,108 @@ class ImageProcessor:
             
             # Convert back to bytes
             output = io.BytesIO()
-            format_to_use = image.format if image.format in ['JPEG', 'PNG', 'WEBP'] else 'JPEG'
-            resized.save(output, format=format_to_use, quality=90)
+            format_to_use = image.format if image.format in _PIL_SAVE_OPTIONS else 'JPEG'
+            if image_type == "analysis":
+                format_to_use = 'JPEG'
+            if format_to_use == 'JPEG' and resized.mode != 'RGB':
+                resized = resized.convert('RGB')
+            resized.save(output, format=format_to_use, **_PIL_SAVE_OPTIONS[format_to_use])
             
             return output.getvalue()
             
         except Exception as e:
             raise ValidationError(f"Cannot resize image: {str(e)}")
             
+    @staticmethod
+    def _resize_with_opencv(
+        image_data: bytes,
+        image_format: str,
+        output_format: str,
+        longest_side: int,
+        max_dimension: int,
+    ) -> bytes | None:
+        """Downscale with area interpolation; None if OpenCV cannot decode it."""
+        nparr = np.frombuffer(image_data, np.uint8)
+
+        if image_format == "JPEG":
+            # Let libjpeg drop DCT coefficients for power-of-two reductions
+            flag = cv2.IMREAD_COLOR
+            for factor, reduced_flag in _JPEG_REDUCED_READS:
+                if longest_side // factor >= max_dimension:
+                    flag = reduced_flag
+                    break
+        elif output_format == "JPEG":
+            flag = cv2.IMREAD_COLOR  # JPEG has no alpha channel
+        else:
+            flag = cv2.IMREAD_UNCHANGED  # Keep PNG/WebP alpha
+        image = cv2.imdecode(nparr, flag)
+        if image is None:
+            return None
+
+        height, width = image.shape[:2]
+        ratio = max_dimension / max(width, height)
+        if ratio < 1:
+            new_size = (int(width * ratio), int(height * ratio))
+            image = cv2.resize(image, new_size, interpolation=cv2.INTER_AREA)
+
+        extension, params = _OPENCV_ENCODINGS[output_format]
+        ok, encoded = cv2.imencode(extension, image, params)
+        return encoded.tobytes() if ok else None
+
     @staticmethod
     def detect_mime_type(image_data: bytes) -> str:
         """Detect MIME type from image data."""
         try:
-            image = Image.open(io.BytesIO(image_data))
-            format_map = {
-                'JPEG': 'image/jpeg',
-                'PNG': 'image/png', 
-                'WEBP': 'image/webp',
-            }
-            return format_map.get(image.format, 'image/jpeg')
-        except Exception:
-            return 'image/jpeg'  # Default fallback
\ No newline at end of file
+            return ImageProcessor.probe(image_data).mime or 'image/jpeg'
+        except ValidationError:
+            return 'image/jpeg'  # Default fallback
+
+    @staticmethod
+    def _probe(data: bytes) -> tuple[str, int, int] | None:
+        """Read (format, width, height) from JPEG, PNG or WebP headers.
+
+        Returns None for anything unrecognized or truncated.
+        """
+        try:
+            # PNG: IHDR is always the first chunk
+            if data[:8] == _PNG_SIGNATURE and data[12:16] == b"IHDR":
+                width, height = struct.unpack_from(">II", data, 16)
+                return "PNG", width, height
+
+            # JPEG: walk segments up to the start-of-frame
+            if data[:2] == b"\xff\xd8":
+                offset = 2
+                while offset + 9 <= len(data):
+                    if data[offset] != 0xFF:
+                        return None
+                    marker = data[offset + 1]
+                    if marker == 0xFF:  # Fill byte
+                        offset += 1
+                        continue
+                    if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # No payload
+                        offset += 2
+                        continue
+                    if marker in _JPEG_SOF_MARKERS:
+                        height, width = struct.unpack_from(">HH", data, offset + 5)
+                        return "JPEG", width, height
+                    (length,) = struct.unpack_from(">H", data, offset + 2)
+                    offset += 2 + length
+                return None
+
+            # WebP: lossy, lossless and extended bitstreams
+            if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+                chunk = data[12:16]
+                if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+                    width, height = struct.unpack_from("<HH", data, 26)
+                    return "WEBP", width & 0x3FFF, height & 0x3FFF
+                if chunk == b"VP8L" and data[20] == 0x2F:
+                    (bits,) = struct.unpack_from("<I", data, 21)
+                    return "WEBP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if chunk == b"VP8X" and len(data) >= 30:
+                    width = int.from_bytes(data[24:27], "little") + 1
+                    height = int.from_bytes(data[27:30], "little") + 1
+                    return "WEBP", width, height
+
+        except (IndexError, struct.error):
+            return None
+        return None
\ No newline at end of file
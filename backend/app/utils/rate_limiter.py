@@ -0,0 +1,64 @@
+"""Client-side concurrency and rate limiting for upstream API calls."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class _TokenBucket:
+    """Continuously refilling bucket holding a per-minute allowance."""
+
+    def __init__(self, per_minute: int) -> None:
+        """Start with a full bucket."""
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Take ``amount`` if available, else return the seconds to wait."""
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+        # A single oversized request may drain the bucket but never deadlock
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            self.available -= amount
+            return 0.0
+        return (amount - self.available) / self.rate
+
+
+class RateLimiter:
+    """Cap concurrent calls and reserve request and token budget before each."""
+
+    def __init__(
+        self,
+        max_concurrent_requests: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+    ) -> None:
+        """Initialize rate limiter."""
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def limit(self, tokens: int) -> AsyncIterator[None]:
+        """Hold a concurrency slot once one request and ``tokens`` are reserved."""
+        async with self._semaphore:
+            # Reserve in arrival order so large requests are not starved
+            async with self._lock:
+                await self._reserve(self._requests, 1)
+                await self._reserve(self._tokens, tokens)
+            yield
+
+    @staticmethod
+    async def _reserve(bucket: _TokenBucket, amount: float) -> None:
+        """Wait until the bucket can cover ``amount``."""
+        while (delay := bucket.take(amount)) > 0:
+            await asyncio.sleep(delay)
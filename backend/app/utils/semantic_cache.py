@@ -0,0 +1,73 @@
+"""In-memory semantic cache for AI chat responses."""
+
+import time
+from collections.abc import Hashable
+
+import numpy as np
+
+
+class _Namespace:
+    """Fixed-capacity ring buffer of normalized embeddings and responses."""
+
+    def __init__(self, capacity: int, dimensions: int) -> None:
+        """Preallocate storage for one namespace."""
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.stored_at = np.full(capacity, -np.inf)
+        self.contents: list[str | None] = [None] * capacity
+        self.size = 0
+        self.next = 0
+
+
+class SemanticCache:
+    """Cache responses keyed by embedding similarity within a namespace."""
+
+    def __init__(
+        self,
+        threshold: float = 0.93,
+        ttl_seconds: float = 24 * 60 * 60,
+        max_entries: int = 1000,
+    ) -> None:
+        """Initialize semantic cache."""
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._namespaces: dict[Hashable, _Namespace] = {}
+
+    def lookup(self, namespace: Hashable, embedding: list[float]) -> str | None:
+        """Return the cached response closest to the embedding, if close enough."""
+        space = self._namespaces.get(namespace)
+        if space is None or space.size == 0:
+            return None
+
+        # One BLAS matrix-vector product over the contiguous buffer
+        scores = space.vectors[:space.size] @ self._normalize(embedding)
+        expired = space.stored_at[:space.size] < time.monotonic() - self.ttl_seconds
+        scores[expired] = -np.inf
+
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return space.contents[best]
+
+    def store(self, namespace: Hashable, embedding: list[float], content: str) -> None:
+        """Store a response under its message embedding."""
+        vector = self._normalize(embedding)
+        space = self._namespaces.get(namespace)
+        if space is None:
+            space = _Namespace(self.max_entries, vector.shape[0])
+            self._namespaces[namespace] = space
+
+        # Overwrite the oldest slot once the buffer is full
+        slot = space.next
+        space.vectors[slot] = vector
+        space.stored_at[slot] = time.monotonic()
+        space.contents[slot] = content
+        space.next = (slot + 1) % self.max_entries
+        space.size = min(space.size + 1, self.max_entries)
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
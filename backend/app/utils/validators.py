@@ -1,9 +1,22 @@
 """Validation utilities for Face Aesthetic API."""
 
 import re
+import string
 from typing import Any
 
 from app.utils.exceptions import ValidationError
+from app.utils.image_processing import ImageInfo
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Password character classes for the ASCII fast path
+_ASCII_UPPER = frozenset(string.ascii_uppercase)
+_ASCII_LOWER = frozenset(string.ascii_lowercase)
+_ASCII_DIGITS = frozenset(string.digits)
+
+# Filename rules for image uploads
+_VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+_DANGEROUS_FILENAME_CHARS = frozenset('<>:"|?*\\')
 
 
 class ImageValidator:
@@ -20,8 +33,16 @@ class ImageValidator:
         filename: str | None,
         content_type: str | None,
         file_size: int,
+        info: ImageInfo | None = None,
     ) -> None:
-        """Validate file upload parameters."""
+        """Validate file upload parameters.
+
+        When ``info`` is given its sniffed MIME type replaces the client's
+        claimed content type and its dimensions are checked too.
+        """
+        if info is not None:
+            content_type = info.mime
+
         # Validate filename
         if not filename:
             raise ValidationError("Filename is required", field="filename")
@@ -53,6 +74,22 @@ class ImageValidator:
                 value=file_size,
             )
 
+        # Validate dimensions
+        if info is not None:
+            if min(info.width, info.height) < cls.MIN_DIMENSION:
+                raise ValidationError(
+                    f"Image too small (minimum {cls.MIN_DIMENSION}x{cls.MIN_DIMENSION})",
+                    field="dimensions",
+                    value=f"{info.width}x{info.height}",
+                )
+
+            if max(info.width, info.height) > cls.MAX_DIMENSION:
+                raise ValidationError(
+                    f"Image too large (maximum {cls.MAX_DIMENSION}x{cls.MAX_DIMENSION})",
+                    field="dimensions",
+                    value=f"{info.width}x{info.height}",
+                )
+
     @staticmethod
     def _is_valid_filename(filename: str) -> bool:
         """Check if filename is valid."""
@@ -61,16 +98,11 @@ class ImageValidator:
             return False
 
         # Check for valid extension
-        valid_extensions = [".jpg", ".jpeg", ".png", ".webp"]
-        if not any(filename.lower().endswith(ext) for ext in valid_extensions):
+        if not filename.lower().endswith(_VALID_EXTENSIONS):
             return False
 
         # Check for dangerous characters
-        dangerous_chars = ["<", ">", ":", '"', "|", "?", "*", "\\"]
-        if any(char in filename for char in dangerous_chars):
-            return False
-
-        return True
+        return _DANGEROUS_FILENAME_CHARS.isdisjoint(filename)
 
 
 class UserValidator:
@@ -79,8 +111,7 @@ class UserValidator:
     @staticmethod
     def validate_email(email: str) -> None:
         """Validate email format."""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if not _EMAIL_RE.match(email):
             raise ValidationError("Invalid email format", field="email", value=email)
 
     @staticmethod
@@ -98,12 +129,20 @@ class UserValidator:
                 field="password",
             )
 
-        # Check for required character types
-        checks = [
-            (any(c.isupper() for c in password), "uppercase letter"),
-            (any(c.islower() for c in password), "lowercase letter"), 
-            (any(c.isdigit() for c in password), "digit"),
-        ]
+        # Check for required character types (set scans run in C and stop at
+        # the first match; non-ASCII falls back to the Unicode predicates)
+        if password.isascii():
+            checks = [
+                (not _ASCII_UPPER.isdisjoint(password), "uppercase letter"),
+                (not _ASCII_LOWER.isdisjoint(password), "lowercase letter"),
+                (not _ASCII_DIGITS.isdisjoint(password), "digit"),
+            ]
+        else:
+            checks = [
+                (any(c.isupper() for c in password), "uppercase letter"),
+                (any(c.islower() for c in password), "lowercase letter"),
+                (any(c.isdigit() for c in password), "digit"),
+            ]
 
         missing = [desc for check, desc in checks if not check]
         if missing:
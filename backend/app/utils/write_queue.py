@@ -0,0 +1,106 @@
+"""Write-behind queue that batches Supabase inserts off the request path."""
+
+import asyncio
+import weakref
+from typing import Any
+
+import orjson
+from loguru import logger
+from supabase import Client
+
+# Live write queues, flushed on application shutdown
+_write_queues: "weakref.WeakSet[BatchWriteQueue]" = weakref.WeakSet()
+
+
+class BatchWriteQueue:
+    """Coalesce row inserts into one table into batched writes."""
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        table: str,
+        flush_interval: float = 0.02,
+        max_batch: int = 25,
+    ) -> None:
+        """Initialize batch write queue."""
+        self.supabase = supabase_client
+        self.table = table
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._worker: asyncio.Task[None] | None = None
+        _write_queues.add(self)
+
+    def put(self, row: dict[str, Any]) -> None:
+        """Queue a row, starting the writer if needed."""
+        self._queue.put_nowait(row)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def flush(self) -> None:
+        """Wait until every queued row has been written."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush queued rows and stop the writer."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _run(self) -> None:
+        """Write queued rows in batches of up to max_batch per flush interval."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            # The PostgREST session is synchronous; keep it off the event loop
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        """Insert one batch, retrying row by row so one bad row drops only itself."""
+        try:
+            self._post(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to store {self.table} row: {str(e)}")
+            else:
+                logger.warning(
+                    f"Batch insert of {len(batch)} {self.table} rows failed, "
+                    f"retrying row by row: {str(e)}"
+                )
+                for row in batch:
+                    try:
+                        self._post([row])
+                    except Exception as row_error:
+                        logger.error(f"Failed to store {self.table} row: {str(row_error)}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _post(self, rows: list[dict[str, Any]]) -> None:
+        """POST rows to the table in one PostgREST request."""
+        # Post pre-encoded orjson bytes through the PostgREST session
+        # (keeps its auth headers) and skip echoing the rows back
+        response = self.supabase.postgrest.session.post(
+            f"/{self.table}",
+            content=orjson.dumps(rows),
+            headers={
+                "Content-Type": "application/json",
+                "Prefer": "return=minimal",
+            },
+        )
+        response.raise_for_status()
+
+async def flush_write_queues() -> None:
+    """Write out all queued rows (call on shutdown)."""
+    for queue in list(_write_queues):
+        await queue.close()
@@ -6,12 +6,15 @@ import os
 import sys
 from pathlib import Path
 
-# Set test environment variables
-os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
-os.environ["SUPABASE_URL"] = "https://test.supabase.co"
-os.environ["SUPABASE_KEY"] = "test-anon-key"
-os.environ["SUPABASE_SERVICE_KEY"] = "test-service-key"
-os.environ["OPENAI_API_KEY"] = "sk-test-key"
+# Set test environment variables, keeping any the caller already exported
+_TEST_ENV = {
+    "SECRET_KEY": "test-secret-key-for-testing-only",
+    "SUPABASE_URL": "https://test.supabase.co",
+    "SUPABASE_KEY": "test-anon-key",
+    "SUPABASE_SERVICE_KEY": "test-service-key",
+    "OPENAI_API_KEY": "sk-test-key",
+}
+os.environ.update({key: value for key, value in _TEST_ENV.items() if key not in os.environ})
 
 # Add the app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / "app"))
@@ -51,11 +54,12 @@ async def test_facial_analyzer():
     
     try:
         from app.core.facial_analyzer import get_facial_analyzer
+        from tests.samples import SAMPLE_PNG
         
         analyzer = get_facial_analyzer()
         
         # Test with a small dummy image (1x1 pixel PNG)
-        dummy_image_data = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx\x9cc```\x00\x00\x00\x04\x00\x01\xdd\x8d\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82'
+        dummy_image_data = SAMPLE_PNG
         
         print("⏳ Testing analysis with dummy image...")
         
@@ -133,76 +137,10 @@ async def test_pydantic_models():
         from app.models.analysis import FaceAnalysisResult, AnalysisResponse
         from app.models.user import User, UserCreate
         from app.models.chat import ChatMessage, ChatSession
-        from datetime import datetime
-        from uuid import uuid4
+        from tests.samples import SAMPLE_ANALYSIS_RESULT
         
-        # Test analysis result model
-        sample_result = FaceAnalysisResult(
-            timestamp=datetime.now(),
-            image_info={"filename": "test.jpg", "dimensions": "100x100", "total_landmarks": 468},
-            face_angle={"angle": "正面", "ratio": 0.5, "confidence": 0.9, "suitable_for_analysis": True},
-            face_contour={
-                "face_area": 15000.0,
-                "face_perimeter": 500.0,
-                "face_width": 150.0,
-                "face_height": 180.0,
-                "small_face_score": 85.0,
-                "cheekbone_width": 140.0,
-                "jaw_width": 120.0,
-                "cheek_jaw_ratio": 0.75,
-                "vline_evaluation": "理想的",
-            },
-            eline={"status": "理想的", "upper_lip_distance": 1.0, "lower_lip_distance": 1.0, "evaluation": "良好"},
-            proportions={"aspect_ratio": 1.618, "closest_ratio": "黄金比", "ideal_ratio": 1.618, "difference": 0.0, "evaluation": "優秀"},
-            philtrum_chin={"philtrum_length": 10.0, "chin_length": 20.0, "ratio": 2.0, "closest_ideal": "クラシック理想", "target_ratio": 2.0, "difference": 0.0, "evaluation": "理想的"},
-            nasolabial_angle={"angle": 105.0, "ideal_range": "100-110度", "status": "理想的", "evaluation": "優秀"},
-            vline={"jaw_angle": 110.0, "sharpness": "シャープ", "evaluation": "良好", "vline_score": 85.0},
-            symmetry={"symmetry_score": 85.0, "asymmetry_level": 15.0, "evaluation": "良好"},
-            dental_protrusion={
-                "max_upper_protrusion": 2.0,
-                "max_lower_protrusion": 1.5,
-                "avg_upper_protrusion": 1.8,
-                "avg_lower_protrusion": 1.3,
-                "lip_status": "理想的",
-                "dental_status": "正常範囲",
-                "teeth_visible": False,
-                "severity": "なし",
-                "lip_balance": "バランス良好",
-                "ideal_range": "Eラインから2-4mm以内",
-                "evaluation": "正常"
-            },
-            facial_harmony={
-                "avg_eye_width": 30.0,
-                "nose_width": 25.0,
-                "mouth_width": 45.0,
-                "face_width": 150.0,
-                "face_height": 180.0,
-                "face_area": 15000.0,
-                "eye_face_ratio": 0.20,
-                "nose_face_ratio": 0.17,
-                "mouth_face_ratio": 0.30,
-                "eye_area_ratio": 0.008,
-                "golden_deviation": 0.1,
-                "face_aspect_ratio": 1.2,
-                "harmony_score": 82.0,
-                "evaluation": "良好",
-                "beauty_level": "高い",
-                "explanation": "バランスの取れた美しい顔立ちです"
-            },
-            overall_score={
-                "score": 85.0,
-                "level": "美人レベル",
-                "tier": "B級",
-                "description": "美しい顔立ち",
-                "emoji": "✨",
-                "detailed_scores": {"eline": 85.0, "harmony": 82.0},
-                "score_breakdown": {"eline": "85.0 (重み15%)"},
-                "severe_flaws": [],
-                "explanation_details": {"strong_points": [], "weak_points": [], "bonus_factors": [], "penalty_factors": [], "improvement_suggestions": []},
-                "note": "総合評価"
-            },
-            beauty_advice=["理想的な美しさです"],
-        )
+        # Test analysis result model (the one full validation of the sample)
+        sample_result = FaceAnalysisResult.model_validate(SAMPLE_ANALYSIS_RESULT)
         
         print("✅ FaceAnalysisResult model created successfully")
         print(f"   Score: {sample_result.overall_score.score}")
@@ -1,53 +1,152 @@
 """Pytest configuration and fixtures."""
 
-import asyncio
+import functools
 import os
 import tempfile
 from pathlib import Path
-from typing import AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Generator
 from uuid import uuid4
 
 import pytest
 import pytest_asyncio
+import respx
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
+
+from tests.samples import SAMPLE_ANALYSIS_RESULT, SAMPLE_PNG
+
+# Set test environment variables, keeping any the caller already exported
+_TEST_ENV = {
+    "SECRET_KEY": "test-secret-key-for-testing-only",
+    "SUPABASE_URL": "https://test.supabase.co",
+    "SUPABASE_KEY": "test-anon-key",
+    "SUPABASE_SERVICE_KEY": "test-service-key",
+    "OPENAI_API_KEY": "sk-test-key",
+    "LINE_CHANNEL_ACCESS_TOKEN": "test-line-token",
+    "LINE_CHANNEL_SECRET": "test-line-secret",
+    "TESTING": "true",
+}
+os.environ.update({key: value for key, value in _TEST_ENV.items() if key not in os.environ})
+
+# Canned upstream replies served by the session-wide respx router
+_OPENAI_EMBEDDING = {
+    "object": "list",
+    "data": [{"object": "embedding", "index": 0, "embedding": [0.0] * 8}],
+    "model": "text-embedding-3-small",
+    "usage": {"prompt_tokens": 1, "total_tokens": 1},
+}
+_OPENAI_CHAT_STREAM = (
+    b'data: {"id":"chatcmpl-test","object":"chat.completion.chunk","created":0,'
+    b'"model":"gpt-4o-mini","choices":[{"index":0,"delta":{"role":"assistant",'
+    b'"content":"test"},"finish_reason":"stop"}]}\n\n'
+    b"data: [DONE]\n\n"
+)
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Run every async test on the session loop that owns async_client."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_external_apis() -> Generator[respx.MockRouter, None, None]:
+    """Answer OpenAI and LINE httpx calls in-process instead of over the network.
+
+    Any other request (Supabase, the ASGI app itself) passes through untouched.
+    """
+    with respx.mock(assert_all_called=False) as router:
+        router.post("https://api.openai.com/v1/embeddings").respond(
+            200, json=_OPENAI_EMBEDDING
+        )
+        router.post("https://api.openai.com/v1/chat/completions").respond(
+            200,
+            content=_OPENAI_CHAT_STREAM,
+            headers={"Content-Type": "text/event-stream"},
+        )
+        router.get(url__startswith="https://api-data.line.me/").respond(
+            200, content=SAMPLE_PNG, headers={"Content-Type": "image/png"}
+        )
+        router.route(host="api.line.me").respond(200, json={})
+        router.route().pass_through()
+        yield router
+
+
+@functools.lru_cache(maxsize=1)
+def _get_app() -> FastAPI:
+    """Import the FastAPI app on first use, not during collection."""
+    from app.main import app
+
+    return app
 
-# Set test environment variables
-os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
-os.environ["SUPABASE_URL"] = "https://test.supabase.co"
-os.environ["SUPABASE_KEY"] = "test-anon-key"
-os.environ["SUPABASE_SERVICE_KEY"] = "test-service-key"
-os.environ["OPENAI_API_KEY"] = "sk-test-key"
-os.environ["LINE_CHANNEL_ACCESS_TOKEN"] = "test-line-token"
-os.environ["LINE_CHANNEL_SECRET"] = "test-line-secret"
-os.environ["TESTING"] = "true"
 
-from app.main import app
-from app.config import settings
+@pytest.fixture(scope="session")
+def client() -> Generator[TestClient, None, None]:
+    """Create test client (app startup runs once per session)."""
+    with TestClient(_get_app()) as test_client:
+        yield test_client
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest.fixture(autouse=True)
+def reset_dependency_overrides() -> Generator[None, None, None]:
+    """Clear dependency overrides after each test so the shared app stays isolated."""
+    yield
+    if _get_app.cache_info().currsize:
+        _get_app().dependency_overrides.clear()
 
 
 @pytest.fixture
-def client() -> Generator[TestClient, None, None]:
-    """Create test client."""
-    with TestClient(app) as test_client:
+def client_isolated() -> Generator[TestClient, None, None]:
+    """Create a fresh test client for tests that need isolated app state."""
+    with TestClient(_get_app()) as test_client:
         yield test_client
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    """Create async test client."""
-    async with AsyncClient(app=app, base_url="http://test") as async_test_client:
+    """Create async test client (one ASGI transport for the session)."""
+    async with AsyncClient(
+        transport=ASGITransport(app=_get_app()), base_url="http://test"
+    ) as async_test_client:
         yield async_test_client
 
 
+@pytest.fixture(scope="session")
+def analyzer():
+    """Get the shared facial analyzer (MediaPipe models load once per session)."""
+    from app.core.facial_analyzer import get_facial_analyzer
+
+    return get_facial_analyzer()
+
+
+@pytest.fixture
+def stub_async(monkeypatch: pytest.MonkeyPatch):
+    """Swap an async method for a stub via plain setattr (no MagicMock).
+
+    ``stub_async("pkg.mod.Class.method", result)`` makes the method return
+    ``result``; pass ``raises=`` to make it raise instead. Returns the list
+    of (args, kwargs) for each call.
+    """
+    def _stub(
+        target: str, result: Any = None, *, raises: Exception | None = None
+    ) -> list[tuple[tuple, dict]]:
+        calls: list[tuple[tuple, dict]] = []
+
+        async def fake(*args: Any, **kwargs: Any) -> Any:
+            calls.append((args, kwargs))
+            if raises is not None:
+                raise raises
+            return result
+
+        monkeypatch.setattr(target, fake)
+        return calls
+
+    return _stub
+
+
 @pytest.fixture
 def temp_dir() -> Generator[Path, None, None]:
     """Create temporary directory for tests."""
@@ -58,127 +157,21 @@ def temp_dir() -> Generator[Path, None, None]:
 @pytest.fixture
 def sample_image_data() -> bytes:
     """Create sample image data for testing."""
-    # 1x1 pixel PNG
-    return b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx\x9cc```\x00\x00\x00\x04\x00\x01\xdd\x8d\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82'
+    return SAMPLE_PNG
 
 
 @pytest.fixture
 def sample_analysis_result() -> dict:
-    """Create sample analysis result for testing."""
-    return {
-        "timestamp": "2024-01-01T00:00:00Z",
-        "image_info": {
-            "filename": "test.jpg",
-            "dimensions": "100x100",
-            "total_landmarks": 468
-        },
-        "face_angle": {
-            "angle": "正面",
-            "ratio": 0.5,
-            "confidence": 0.9,
-            "suitable_for_analysis": True
-        },
-        "face_contour": {
-            "face_area": 15000.0,
-            "face_perimeter": 500.0,
-            "face_width": 150.0,
-            "face_height": 180.0,
-            "small_face_score": 85.0,
-            "cheekbone_width": 140.0,
-            "jaw_width": 120.0,
-            "cheek_jaw_ratio": 0.75,
-            "vline_evaluation": "理想的"
-        },
-        "eline": {
-            "status": "理想的",
-            "upper_lip_distance": 1.0,
-            "lower_lip_distance": 1.0,
-            "evaluation": "良好"
-        },
-        "proportions": {
-            "aspect_ratio": 1.618,
-            "closest_ratio": "黄金比",
-            "ideal_ratio": 1.618,
-            "difference": 0.0,
-            "evaluation": "優秀"
-        },
-        "philtrum_chin": {
-            "philtrum_length": 10.0,
-            "chin_length": 20.0,
-            "ratio": 2.0,
-            "closest_ideal": "クラシック理想",
-            "target_ratio": 2.0,
-            "difference": 0.0,
-            "evaluation": "理想的"
-        },
-        "nasolabial_angle": {
-            "angle": 105.0,
-            "ideal_range": "100-110度",
-            "status": "理想的",
-            "evaluation": "優秀"
-        },
-        "vline": {
-            "jaw_angle": 110.0,
-            "sharpness": "シャープ",
-            "evaluation": "良好",
-            "vline_score": 85.0
-        },
-        "symmetry": {
-            "symmetry_score": 85.0,
-            "asymmetry_level": 15.0,
-            "evaluation": "良好"
-        },
-        "dental_protrusion": {
-            "max_upper_protrusion": 2.0,
-            "max_lower_protrusion": 1.5,
-            "avg_upper_protrusion": 1.8,
-            "avg_lower_protrusion": 1.3,
-            "lip_status": "理想的",
-            "dental_status": "正常範囲",
-            "teeth_visible": False,
-            "severity": "なし",
-            "lip_balance": "バランス良好",
-            "ideal_range": "Eラインから2-4mm以内",
-            "evaluation": "正常"
-        },
-        "facial_harmony": {
-            "avg_eye_width": 30.0,
-            "nose_width": 25.0,
-            "mouth_width": 45.0,
-            "face_width": 150.0,
-            "face_height": 180.0,
-            "face_area": 15000.0,
-            "eye_face_ratio": 0.20,
-            "nose_face_ratio": 0.17,
-            "mouth_face_ratio": 0.30,
-            "eye_area_ratio": 0.008,
-            "golden_deviation": 0.1,
-            "face_aspect_ratio": 1.2,
-            "harmony_score": 82.0,
-            "evaluation": "良好",
-            "beauty_level": "高い",
-            "explanation": "バランスの取れた美しい顔立ちです"
-        },
-        "overall_score": {
-            "score": 85.0,
-            "level": "美人レベル",
-            "tier": "B級",
-            "description": "美しい顔立ち",
-            "emoji": "✨",
-            "detailed_scores": {"eline": 85.0, "harmony": 82.0},
-            "score_breakdown": {"eline": "85.0 (重み15%)"},
-            "severe_flaws": [],
-            "explanation_details": {
-                "strong_points": [],
-                "weak_points": [],
-                "bonus_factors": [],
-                "penalty_factors": [],
-                "improvement_suggestions": []
-            },
-            "note": "総合評価"
-        },
-        "beauty_advice": ["理想的な美しさです"]
-    }
+    """Create sample analysis result for testing (shared, treat as read-only)."""
+    return SAMPLE_ANALYSIS_RESULT
+
+
+@pytest.fixture(scope="session")
+def json_loads():
+    """Get a fast JSON decoder for response bodies (orjson)."""
+    import orjson
+
+    return orjson.loads
 
 
 @pytest.fixture
@@ -235,17 +228,14 @@ def sample_line_event() -> dict:
     }
 
 
-@pytest.fixture(autouse=True)
-def setup_test_environment():
-    """Set up test environment before each test."""
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_environment() -> None:
+    """Check the test configuration once; it is a session precondition."""
+    from app.config import settings
+
     # Ensure test configuration
     assert settings.testing is True
     assert "test" in settings.secret_key.lower()
-    
-    # Any additional setup can go here
-    yield
-    
-    # Cleanup after test if needed
 
 
 class MockSupabaseClient:
@@ -253,10 +243,24 @@ class MockSupabaseClient:
     
     def __init__(self):
         self.data_store = {}
+        self.rpc_results = {}
     
     def table(self, table_name: str):
         return MockTable(table_name, self.data_store)
 
+    def rpc(self, fn: str, params: dict):
+        return MockRpcCall(self.rpc_results.get(fn))
+
+
+class MockRpcCall:
+    """Mock Supabase RPC call returning a canned result."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return MockResponse(self.data)
+
 
 class MockTable:
     """Mock Supabase table for testing."""
@@ -265,19 +269,15 @@ class MockTable:
         self.table_name = table_name
         self.data_store = data_store
         self._filters = {}
+        self._single = False
         
     def select(self, columns: str = "*"):
         return self
         
     def insert(self, data: dict):
-        if self.table_name not in self.data_store:
-            self.data_store[self.table_name] = []
-        
-        # Add ID if not provided
-        if "id" not in data:
-            data["id"] = str(uuid4())
-            
-        self.data_store[self.table_name].append(data)
+        # Add ID if not provided (before the row becomes visible)
+        data.setdefault("id", os.urandom(16).hex())
+        self.data_store.setdefault(self.table_name, []).append(data)
         return MockResponse([data])
         
     def eq(self, column: str, value):
@@ -285,18 +285,22 @@ class MockTable:
         return self
         
     def execute(self):
-        if self.table_name not in self.data_store:
-            return MockResponse([])
-            
-        data = self.data_store[self.table_name]
+        data = self.data_store.get(self.table_name, [])
         
-        # Apply filters
-        for column, value in self._filters.items():
-            data = [item for item in data if item.get(column) == value]
-            
+        # Apply all filters in a single pass over the rows
+        if self._filters:
+            filters = tuple(self._filters.items())
+            data = [
+                item for item in data
+                if all(item.get(column) == value for column, value in filters)
+            ]
+
+        if self._single:
+            return MockResponse.single(data[0] if data else None)
         return MockResponse(data)
         
     def single(self):
+        self._single = True
         return self
 
 
@@ -304,7 +308,12 @@ class MockResponse:
     """Mock Supabase response for testing."""
     
     def __init__(self, data: list):
-        self.data = data if isinstance(data, list) else [data] if data else []
+        self.data = data
+
+    @classmethod
+    def single(cls, item: dict | None) -> "MockResponse":
+        """Create a response for a ``.single()`` query."""
+        return cls([item] if item else [])
 
 
 @pytest.fixture
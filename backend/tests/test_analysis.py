@@ -1,10 +1,35 @@
 """Test analysis endpoints and functionality."""
 
+import asyncio
 import io
 from unittest.mock import Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from PIL import Image
+
+_ANALYZE = "app.core.facial_analyzer.ModernFacialBeautyAnalyzer.analyze_image_async"
+
+
+@pytest.fixture
+def upload_pipeline(stub_async, mock_supabase_client):
+    """Serve /upload from the mock Supabase client with storage stubbed out."""
+    from app.dependencies import get_supabase_client
+    from app.main import app
+
+    app.dependency_overrides[get_supabase_client] = lambda: mock_supabase_client
+    return stub_async(
+        "app.services.storage_service.StorageService.upload_image",
+        "https://storage.test/analysis/test.png",
+    )
+
+
+@pytest.fixture(scope="module")
+def upload_image_data() -> bytes:
+    """Create a PNG large enough to pass the upload size check."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (120, 120), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
 
 
 def test_analyze_endpoint_no_file(client: TestClient):
@@ -20,7 +45,7 @@ def test_analyze_endpoint_invalid_file_type(client: TestClient):
     
     response = client.post(
         "/api/v1/analysis/analyze",
-        files={"file": ("test.txt", io.BytesIO(file_content), "text/plain")}
+        files={"file": ("test.txt", file_content, "text/plain")}
     )
     
     assert response.status_code == 400
@@ -31,7 +56,7 @@ def test_analyze_endpoint_valid_image_no_face(client: TestClient, sample_image_d
     """Test analysis endpoint with valid image but no face detected."""
     response = client.post(
         "/api/v1/analysis/analyze",
-        files={"file": ("test.png", io.BytesIO(sample_image_data), "image/png")}
+        files={"file": ("test.png", sample_image_data, "image/png")}
     )
     
     # Should return error because no face is detected in the sample image
@@ -39,93 +64,24 @@ def test_analyze_endpoint_valid_image_no_face(client: TestClient, sample_image_d
     assert "No face detected" in response.json()["detail"]
 
 
-@patch('app.core.facial_analyzer.ModernFacialBeautyAnalyzer.analyze_image_async')
-def test_analyze_endpoint_success(mock_analyze, client: TestClient, 
-                                 sample_image_data: bytes, sample_analysis_result: dict):
-    """Test successful analysis endpoint."""
-    # Mock the analysis result
-    mock_analyze.return_value = sample_analysis_result
-    
-    response = client.post(
-        "/api/v1/analysis/analyze",
-        files={"file": ("test.png", io.BytesIO(sample_image_data), "image/png")},
-        data={"analysis_type": "full"}
-    )
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    assert data["success"] is True
-    assert "data" in data
-    assert data["data"]["overall_score"]["score"] == 85.0
-    assert "processing_time_ms" in data
-
-
-def test_analyze_endpoint_large_file(client: TestClient):
-    """Test analysis endpoint with file too large."""
-    # Create a large file (>10MB)
-    large_content = b"x" * (11 * 1024 * 1024)  # 11MB
-    
-    response = client.post(
-        "/api/v1/analysis/analyze",
-        files={"file": ("large.png", io.BytesIO(large_content), "image/png")}
-    )
-    
-    assert response.status_code == 413  # Payload too large
-
-
-def test_get_analysis_types(client: TestClient):
-    """Test get analysis types endpoint."""
-    response = client.get("/api/v1/analysis/types")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "analysis_types" in data
-    assert len(data["analysis_types"]) > 0
-    
-    # Check that full analysis type exists
-    full_type = next((t for t in data["analysis_types"] if t["type"] == "full"), None)
-    assert full_type is not None
-    assert "features" in full_type
-
-
-def test_get_analysis_features(client: TestClient):
-    """Test get analysis features endpoint."""
-    response = client.get("/api/v1/analysis/features")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "features" in data
-    assert len(data["features"]) > 0
-    
-    # Check that features have required fields
-    for feature in data["features"]:
-        assert "name" in feature
-        assert "description" in feature
-        assert "category" in feature
-
-
-@patch('app.services.analysis_service.AnalysisService.get_user_analysis_history')
-def test_get_analysis_history_unauthorized(mock_get_history, client: TestClient):
-    """Test get analysis history without authentication."""
-    response = client.get("/api/v1/analysis/history")
-    assert response.status_code == 400  # Bad request (no user_id)
-
-
-@patch('app.services.analysis_service.AnalysisService.get_user_analysis_history')
-def test_get_analysis_history_success(mock_get_history, client: TestClient, 
-                                     test_user_id: str, sample_analysis_result: dict):
-    """Test successful get analysis history."""
-    # Mock the history result
-    mock_get_history.return_value = [sample_analysis_result]
+def test_analyze_endpoint_success(upload_pipeline, analyzer, client: TestClient, json_loads,
+                                 upload_image_data: bytes, sample_analysis_result: dict):
+    """Test successful analysis through the upload endpoint."""
+    # Mock the analysis result on the shared analyzer instance
+    with patch.object(analyzer, "analyze_image_async", return_value=sample_analysis_result):
+        response = client.post(
+            "/api/v1/analysis/upload",
+            files={"file": ("test.png", upload_image_data, "image/png")},
+            data={"analysis_type": "full"}
+        )
     
-    response = client.get(f"/api/v1/analysis/history?user_id={test_user_id}")
-    assert response.status_code == 200
+    assert response.status_code == 201
+    data = json_loads(response.content)
     
-    data = response.json()
-    assert "analyses" in data
-    assert len(data["analyses"]) == 1
-    assert data["analyses"][0]["overall_score"]["score"] == 85.0
+    assert data["status"] == "completed"
+    assert data["image_url"] == "https://storage.test/analysis/test.png"
+    assert data["result"]["overall_score"]["score"] == 85.0
+    assert "processing_time" in data
 
 
 def test_analysis_status_endpoint(client: TestClient):
@@ -151,20 +107,22 @@ async def test_async_analyze_endpoint(async_client, sample_image_data: bytes):
     assert response.status_code in [200, 422]  # Either success or validation error
 
 
-def test_analysis_rate_limiting(client: TestClient, sample_image_data: bytes):
-    """Test rate limiting on analysis endpoint."""
-    # Note: This test might need adjustment based on actual rate limiting implementation
-    responses = []
-    
-    for i in range(5):  # Try multiple requests quickly
-        response = client.post(
-            "/api/v1/analysis/analyze",
-            files={"file": (f"test{i}.png", io.BytesIO(sample_image_data), "image/png")}
+@pytest.mark.asyncio
+async def test_analysis_rate_limiting(upload_pipeline, stub_async, async_client,
+                                      upload_image_data: bytes, sample_analysis_result: dict):
+    """Test a concurrent burst of uploads is served without being throttled."""
+    stub_async(_ANALYZE, sample_analysis_result)
+
+    responses = await asyncio.gather(*(
+        async_client.post(
+            "/api/v1/analysis/upload",
+            files={"file": (f"test{i}.png", upload_image_data, "image/png")}
         )
-        responses.append(response.status_code)
-    
-    # At least some requests should succeed (or fail with known errors, not rate limit)
-    assert any(status in [200, 422] for status in responses)
+        for i in range(5)
+    ))
+
+    assert [response.status_code for response in responses] == [201] * 5
+    assert len(upload_pipeline) == 5
 
 
 def test_analysis_validation_errors(client: TestClient):
@@ -182,16 +140,15 @@ def test_analysis_validation_errors(client: TestClient):
     assert response.status_code == 422
 
 
-@patch('app.core.facial_analyzer.ModernFacialBeautyAnalyzer.analyze_image_async')
-def test_analysis_error_handling(mock_analyze, client: TestClient, sample_image_data: bytes):
-    """Test error handling in analysis endpoint."""
-    # Mock an analysis error
-    mock_analyze.side_effect = Exception("Analysis failed")
-    
-    response = client.post(
-        "/api/v1/analysis/analyze",
-        files={"file": ("test.png", io.BytesIO(sample_image_data), "image/png")}
-    )
+def test_analysis_error_handling(upload_pipeline, analyzer, client: TestClient,
+                                 upload_image_data: bytes):
+    """Test analyzer failures surface as a 400 from the upload endpoint."""
+    # Mock an analysis error on the shared analyzer instance
+    with patch.object(analyzer, "analyze_image_async", side_effect=Exception("Analysis failed")):
+        response = client.post(
+            "/api/v1/analysis/upload",
+            files={"file": ("test.png", upload_image_data, "image/png")}
+        )
     
-    assert response.status_code == 500
-    assert "Analysis failed" in response.json()["detail"]
\ No newline at end of file
+    assert response.status_code == 400
+    assert "Analysis failed" in response.json()["detail"]
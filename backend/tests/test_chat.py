@@ -1,11 +1,14 @@
 """Test chat endpoints and functionality."""
 
-from unittest.mock import Mock, patch
-from uuid import uuid4
+from uuid import UUID
 
 import pytest
 from fastapi.testclient import TestClient
 
+# Fixed IDs for request paths and bodies; no test relies on them being unique
+_SESSION_ID = "00000000-0000-4000-8000-000000000001"
+_ANALYSIS_ID = "00000000-0000-4000-8000-000000000003"
+
 
 def test_create_chat_session_missing_data(client: TestClient):
     """Test creating chat session with missing data."""
@@ -13,249 +16,156 @@ def test_create_chat_session_missing_data(client: TestClient):
     assert response.status_code == 422  # Validation error
 
 
-@patch('app.services.chatbot_service.BeautyChatbotService.create_chat_session')
-def test_create_chat_session_success(mock_create_session, client: TestClient, 
-                                   test_user_id: str):
-    """Test successful chat session creation."""
-    session_id = str(uuid4())
-    mock_session = Mock()
-    mock_session.id = session_id
-    mock_session.title = "Test Session"
-    mock_session.user_id = test_user_id
-    mock_session.context_type = "general"
-    mock_session.is_active = True
-    mock_session.message_count = 0
-    
-    mock_create_session.return_value = mock_session
-    
+def test_create_chat_session_not_implemented(client: TestClient):
+    """Test that a valid session body reaches the unimplemented endpoint."""
     request_data = {
-        "user_id": test_user_id,
         "title": "Test Session",
         "context_type": "general"
     }
     
     response = client.post("/api/v1/chat/sessions", json=request_data)
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert data["success"] is True
-    assert "session" in data
-    assert data["session"]["id"] == session_id
-
-
-@patch('app.services.chatbot_service.BeautyChatbotService.send_message')
-def test_send_chat_message_success(mock_send_message, client: TestClient, 
-                                  test_session_id: str, test_user_id: str):
-    """Test successful chat message sending."""
-    mock_response = Mock()
-    mock_response.message = "こんにちは！美容について何でもお聞きください。"
-    mock_response.session_id = test_session_id
-    mock_response.message_id = str(uuid4())
-    mock_response.suggestions = ["スキンケアについて", "メイクのコツ"]
-    mock_response.analysis_insights = {}
-    mock_response.beauty_tips = ["保湿が重要です"]
-    
-    mock_send_message.return_value = mock_response
-    
-    request_data = {
-        "session_id": test_session_id,
-        "user_id": test_user_id,
-        "message": "こんにちは"
-    }
-    
-    response = client.post("/api/v1/chat/messages", json=request_data)
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert data["success"] is True
-    assert "response" in data
-    assert "message" in data["response"]
-    assert "suggestions" in data["response"]
+    assert response.status_code == 501
+    assert "not yet implemented" in response.json()["detail"]
+
+
+def test_send_chat_message_not_implemented(client: TestClient):
+    """Test that a valid message reaches the unimplemented endpoint."""
+    response = client.post(
+        f"/api/v1/chat/sessions/{_SESSION_ID}/messages",
+        json={"message": "こんにちは"}
+    )
+    assert response.status_code == 501
+    assert "not yet implemented" in response.json()["detail"]
 
 
 def test_send_chat_message_missing_data(client: TestClient):
     """Test sending chat message with missing data."""
-    response = client.post("/api/v1/chat/messages", json={})
+    response = client.post(f"/api/v1/chat/sessions/{_SESSION_ID}/messages", json={})
     assert response.status_code == 422  # Validation error
 
 
-@patch('app.services.chatbot_service.BeautyChatbotService.get_chat_sessions')
-def test_get_chat_sessions_success(mock_get_sessions, client: TestClient, test_user_id: str):
-    """Test successful chat sessions retrieval."""
-    mock_session = Mock()
-    mock_session.id = str(uuid4())
-    mock_session.title = "Test Session"
-    mock_session.user_id = test_user_id
-    mock_session.context_type = "general"
-    mock_session.is_active = True
-    mock_session.message_count = 5
-    
-    mock_get_sessions.return_value = [mock_session]
-    
-    response = client.get(f"/api/v1/chat/sessions?user_id={test_user_id}")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "sessions" in data
-    assert len(data["sessions"]) == 1
-    assert data["sessions"][0]["id"] == str(mock_session.id)
-
-
-def test_get_chat_sessions_missing_user_id(client: TestClient):
-    """Test getting chat sessions without user ID."""
+def test_get_chat_sessions_not_implemented(client: TestClient):
+    """Test listing chat sessions on the unimplemented endpoint."""
     response = client.get("/api/v1/chat/sessions")
-    assert response.status_code == 400  # Bad request
-
-
-@patch('app.services.chatbot_service.BeautyChatbotService.get_session_messages')
-def test_get_session_messages_success(mock_get_messages, client: TestClient, 
-                                     test_session_id: str, test_user_id: str):
-    """Test successful session messages retrieval."""
-    mock_message = Mock()
-    mock_message.id = str(uuid4())
-    mock_message.session_id = test_session_id
-    mock_message.role = "user"
-    mock_message.content = "こんにちは"
-    mock_message.created_at = "2024-01-01T00:00:00Z"
-    
-    mock_get_messages.return_value = [mock_message]
-    
-    response = client.get(
-        f"/api/v1/chat/sessions/{test_session_id}/messages?user_id={test_user_id}"
-    )
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "messages" in data
-    assert len(data["messages"]) == 1
-    assert data["messages"][0]["content"] == "こんにちは"
+    assert response.status_code == 501
 
 
-def test_get_session_messages_missing_user_id(client: TestClient, test_session_id: str):
-    """Test getting session messages without user ID."""
-    response = client.get(f"/api/v1/chat/sessions/{test_session_id}/messages")
-    assert response.status_code == 400  # Bad request
+def test_get_chat_session_not_implemented(client: TestClient):
+    """Test fetching one chat session on the unimplemented endpoint."""
+    response = client.get(f"/api/v1/chat/sessions/{_SESSION_ID}")
+    assert response.status_code == 501
 
 
-def test_chat_service_status(client: TestClient):
-    """Test chat service status endpoint."""
-    response = client.get("/api/v1/chat/status")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "status" in data
-    assert "openai_configured" in data
-    assert "model_info" in data
-
-
-@patch('app.services.chatbot_service.BeautyChatbotService.send_message')
-def test_chat_message_with_analysis_context(mock_send_message, client: TestClient,
-                                           test_session_id: str, test_user_id: str):
-    """Test chat message with analysis context."""
-    analysis_id = str(uuid4())
-    
-    mock_response = Mock()
-    mock_response.message = "分析結果に基づいてアドバイスします。"
-    mock_response.session_id = test_session_id
-    mock_response.message_id = str(uuid4())
-    mock_response.suggestions = ["詳しい分析", "改善方法"]
-    mock_response.analysis_insights = {"score": 85}
-    mock_response.beauty_tips = []
-    
-    mock_send_message.return_value = mock_response
-    
+def test_chat_message_with_analysis_context(client: TestClient):
+    """Test that a message with analysis context passes validation."""
     request_data = {
-        "session_id": test_session_id,
-        "user_id": test_user_id,
         "message": "分析結果について教えて",
-        "analysis_id": analysis_id
+        "analysis_id": _ANALYSIS_ID,
+        "context_type": "analysis_review"
     }
     
-    response = client.post("/api/v1/chat/messages", json=request_data)
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert data["success"] is True
-    assert "analysis_insights" in data["response"]
+    response = client.post(
+        f"/api/v1/chat/sessions/{_SESSION_ID}/messages", json=request_data
+    )
+    assert response.status_code == 501
 
 
-@patch('app.services.chatbot_service.BeautyChatbotService.create_chat_session')
-def test_create_chat_session_with_analysis(mock_create_session, client: TestClient,
-                                          test_user_id: str):
-    """Test creating chat session with analysis context."""
-    session_id = str(uuid4())
-    analysis_id = str(uuid4())
-    
-    mock_session = Mock()
-    mock_session.id = session_id
-    mock_session.title = "分析結果について相談"
-    mock_session.user_id = test_user_id
-    mock_session.context_type = "analysis_consultation"
-    mock_session.analysis_id = analysis_id
-    mock_session.is_active = True
-    mock_session.message_count = 0
-    
-    mock_create_session.return_value = mock_session
-    
+def test_create_chat_session_with_analysis(client: TestClient):
+    """Test that a session body with analysis context passes validation."""
     request_data = {
-        "user_id": test_user_id,
         "title": "分析結果について相談",
-        "context_type": "analysis_consultation",
-        "analysis_id": analysis_id,
+        "context_type": "analysis_review",
+        "analysis_id": _ANALYSIS_ID,
         "initial_message": "この分析結果について教えてください"
     }
     
     response = client.post("/api/v1/chat/sessions", json=request_data)
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert data["success"] is True
-    assert data["session"]["analysis_id"] == analysis_id
+    assert response.status_code == 501
+
+
+@pytest.mark.parametrize(
+    "url,payload",
+    [
+        ("/api/v1/chat/sessions", {"context_type": "invalid"}),
+        (f"/api/v1/chat/sessions/{_SESSION_ID}/messages", {"message": ""}),
+    ],
+    ids=["sessions", "messages"],
+)
+def test_chat_validation_errors(client: TestClient, url: str, payload: dict):
+    """Test validation errors on invalid chat request bodies."""
+    response = client.post(url, json=payload)
+    assert response.status_code == 422
 
 
-def test_chat_validation_errors(client: TestClient):
-    """Test various validation errors in chat endpoints."""
-    # Test invalid session creation
-    response = client.post("/api/v1/chat/sessions", json={"invalid": "data"})
-    assert response.status_code == 422
-    
-    # Test invalid message sending
-    response = client.post("/api/v1/chat/messages", json={"invalid": "data"})
-    assert response.status_code == 422
-    
-    # Test invalid session ID format
-    response = client.get("/api/v1/chat/sessions/invalid-uuid/messages?user_id=test")
+def test_chat_invalid_session_id(client: TestClient):
+    """Test validation error on an invalid session ID format."""
+    response = client.get("/api/v1/chat/sessions/invalid-uuid")
     assert response.status_code == 422
 
 
-@patch('app.services.chatbot_service.BeautyChatbotService.send_message')
-def test_chat_error_handling(mock_send_message, client: TestClient,
-                            test_session_id: str, test_user_id: str):
-    """Test error handling in chat endpoints."""
-    # Mock a chatbot error
-    mock_send_message.side_effect = Exception("OpenAI API error")
-    
-    request_data = {
-        "session_id": test_session_id,
-        "user_id": test_user_id,
-        "message": "こんにちは"
-    }
-    
-    response = client.post("/api/v1/chat/messages", json=request_data)
-    assert response.status_code == 500
-    assert "Failed to process message" in response.json()["detail"]
+def test_delete_chat_session_not_implemented(client: TestClient):
+    """Test deleting a chat session on the unimplemented endpoint."""
+    response = client.delete(f"/api/v1/chat/sessions/{_SESSION_ID}")
+    assert response.status_code == 501
+
+
+def test_update_session_title_not_implemented(client: TestClient):
+    """Test renaming a chat session on the unimplemented endpoint."""
+    response = client.patch(
+        f"/api/v1/chat/sessions/{_SESSION_ID}/title", params={"title": "新しいタイトル"}
+    )
+    assert response.status_code == 501
 
 
 @pytest.mark.asyncio
-async def test_async_chat_message(async_client, test_session_id: str, test_user_id: str):
+async def test_async_chat_message(async_client, test_session_id: str):
     """Test chat message with async client."""
-    request_data = {
-        "session_id": test_session_id,
-        "user_id": test_user_id,
-        "message": "テストメッセージ"
+    response = await async_client.post(
+        f"/api/v1/chat/sessions/{test_session_id}/messages",
+        json={"message": "テストメッセージ"}
+    )
+    assert response.status_code == 501
+
+
+@pytest.mark.asyncio
+async def test_send_message_serves_semantic_cache_hit(
+    monkeypatch: pytest.MonkeyPatch, mock_supabase_client,
+    test_session_id: str, test_user_id: str
+):
+    """Test an opening question is answered from the semantic cache."""
+    from app.services.chatbot_service import BeautyChatbotService
+
+    now = "2024-01-01T00:00:00+00:00"
+    mock_supabase_client.rpc_results["chat_bootstrap"] = {
+        "session": {
+            "id": test_session_id,
+            "user_id": test_user_id,
+            "title": "美容相談",
+            "context_type": "general",
+            "created_at": now,
+            "updated_at": now,
+        },
+        "history": [],
+        "analysis": None,
     }
-    
-    response = await async_client.post("/api/v1/chat/messages", json=request_data)
-    
-    # Should reach endpoint (may fail due to missing OpenAI key, but that's expected)
-    assert response.status_code in [200, 500, 422]
\ No newline at end of file
+    service = BeautyChatbotService(mock_supabase_client)
+
+    async def embed(text: str) -> list[float]:
+        return [1.0, 0.0, 0.0]
+
+    async def generate(**kwargs):
+        raise AssertionError("OpenAI must not be called on a cache hit")
+
+    monkeypatch.setattr(service, "_embed", embed)
+    monkeypatch.setattr(service, "_generate_ai_response", generate)
+    service.response_cache.store("general", [1.0, 0.0, 0.0], "キャッシュ済みの回答")
+
+    response = await service.send_message(
+        session_id=UUID(test_session_id),
+        user_id=UUID(test_user_id),
+        message="おすすめのスキンケアは？",
+    )
+    await service.message_writer.close()
+
+    assert response.message == "キャッシュ済みの回答"
+    assert response.session_id == UUID(test_session_id)
@@ -1,12 +1,20 @@
 """Test LINE Bot endpoints and functionality."""
 
-import json
-from unittest.mock import Mock, patch
 
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 
 
+@pytest.fixture
+def linebot_configured(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Configure LINE credentials on the shared settings the app reads."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "line_channel_access_token", "test-token")
+    monkeypatch.setattr(settings, "line_channel_secret", "test-secret")
+
+
 def test_linebot_info_not_configured(client: TestClient):
     """Test LINE Bot info when not configured."""
     response = client.get("/api/v1/linebot/info")
@@ -24,11 +32,7 @@ def test_linebot_health_not_configured(client: TestClient):
     assert response.status_code == 503  # Service unavailable
 
 
-@patch.dict('os.environ', {
-    'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-    'LINE_CHANNEL_SECRET': 'test-secret'
-})
-def test_linebot_info_configured(client: TestClient):
+def test_linebot_info_configured(linebot_configured, client: TestClient):
     """Test LINE Bot info when configured."""
     response = client.get("/api/v1/linebot/info")
     assert response.status_code == 200
@@ -41,11 +45,7 @@ def test_linebot_info_configured(client: TestClient):
     assert data["features"]["image_analysis"] is True
 
 
-@patch.dict('os.environ', {
-    'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-    'LINE_CHANNEL_SECRET': 'test-secret'
-})
-def test_linebot_health_configured(client: TestClient):
+def test_linebot_health_configured(linebot_configured, client: TestClient):
     """Test LINE Bot health check when configured."""
     response = client.get("/api/v1/linebot/health")
     assert response.status_code == 200
@@ -62,26 +62,20 @@ def test_linebot_webhook_not_configured(client: TestClient):
     assert response.status_code == 501  # Not implemented
 
 
-def test_linebot_webhook_missing_signature(client: TestClient):
+def test_linebot_webhook_missing_signature(linebot_configured, client: TestClient):
     """Test LINE Bot webhook with missing signature."""
-    with patch.dict('os.environ', {
-        'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-        'LINE_CHANNEL_SECRET': 'test-secret'
-    }):
-        response = client.post("/api/v1/linebot/webhook")
-        assert response.status_code == 400
-        assert "Missing X-Line-Signature header" in response.json()["detail"]
-
-
-@patch.dict('os.environ', {
-    'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-    'LINE_CHANNEL_SECRET': 'test-secret'
-})
-@patch('app.services.linebot_service.LineBotService.handle_webhook')
-def test_linebot_webhook_success(mock_handle_webhook, client: TestClient, 
+    response = client.post("/api/v1/linebot/webhook")
+    assert response.status_code == 400
+    assert "Missing X-Line-Signature header" in response.json()["detail"]
+
+
+def test_linebot_webhook_success(stub_async, linebot_configured, client: TestClient, 
                                 sample_line_event: dict):
     """Test successful LINE Bot webhook handling."""
-    mock_handle_webhook.return_value = {"status": "success", "message": "Events processed"}
+    stub_async(
+        'app.services.linebot_service.LineBotService.handle_webhook',
+        {"status": "success", "message": "Events processed"},
+    )
     
     webhook_body = {
         "events": [sample_line_event],
@@ -99,16 +93,14 @@ def test_linebot_webhook_success(mock_handle_webhook, client: TestClient,
     assert data["status"] == "success"
 
 
-@patch.dict('os.environ', {
-    'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-    'LINE_CHANNEL_SECRET': 'test-secret'
-})
-@patch('app.services.linebot_service.LineBotService.handle_webhook')
-def test_linebot_webhook_error(mock_handle_webhook, client: TestClient, 
+def test_linebot_webhook_error(stub_async, linebot_configured, client: TestClient, 
                               sample_line_event: dict):
     """Test LINE Bot webhook error handling."""
     from app.utils.exceptions import LineBotError
-    mock_handle_webhook.side_effect = LineBotError("Invalid signature", provider="line")
+    stub_async(
+        'app.services.linebot_service.LineBotService.handle_webhook',
+        raises=LineBotError("Invalid signature", provider="line"),
+    )
     
     webhook_body = {
         "events": [sample_line_event],
@@ -125,11 +117,7 @@ def test_linebot_webhook_error(mock_handle_webhook, client: TestClient,
     assert "Invalid signature" in response.json()["detail"]
 
 
-@patch.dict('os.environ', {
-    'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-    'LINE_CHANNEL_SECRET': 'test-secret'
-})
-def test_linebot_test_message(client: TestClient):
+def test_linebot_test_message(linebot_configured, client: TestClient):
     """Test LINE Bot test message endpoint."""
     response = client.post(
         "/api/v1/linebot/test-message",
@@ -155,11 +143,15 @@ def test_linebot_test_message_not_configured(client: TestClient):
     assert response.status_code == 501  # Not implemented
 
 
-@patch('app.services.linebot_service.LineBotService')
-def test_linebot_service_creation(mock_service_class, mock_supabase_client):
+def test_linebot_service_creation(monkeypatch: pytest.MonkeyPatch, mock_supabase_client):
     """Test LINE Bot service creation."""
     from app.services.linebot_service import get_linebot_service
     
+    # Skip building real LINE API clients
+    monkeypatch.setattr(
+        "app.services.linebot_service.LineBotService", lambda client: object()
+    )
+    
     service = get_linebot_service(mock_supabase_client)
     assert service is not None
     
@@ -185,16 +177,11 @@ def test_linebot_webhook_validation_errors(client: TestClient):
 
 
 def test_linebot_endpoints_accessibility(client: TestClient):
-    """Test that all LINE Bot endpoints are accessible."""
-    endpoints = [
-        "/api/v1/linebot/info",
-        "/api/v1/linebot/health"
-    ]
-    
-    for endpoint in endpoints:
-        response = client.get(endpoint)
-        # Should be accessible (may return error due to configuration, but not 404)
-        assert response.status_code != 404
+    """Test that all LINE Bot endpoints are registered."""
+    # Check the route table directly; no request needs to run
+    paths = {route.path for route in client.app.router.routes}
+    assert "/api/v1/linebot/info" in paths
+    assert "/api/v1/linebot/health" in paths
 
 
 @pytest.mark.asyncio
@@ -215,54 +202,71 @@ async def test_async_linebot_webhook(async_client, sample_line_event: dict):
     assert response.status_code in [200, 400, 501]
 
 
-def test_linebot_webhook_event_types(client: TestClient):
+_EVENT_BASE = {
+    "source": {"type": "user", "userId": "test-user"},
+    "timestamp": 1640995200000,
+    "mode": "active",
+    "deliveryContext": {"isRedelivery": False},
+}
+_TEXT_EVENT = {
+    **_EVENT_BASE,
+    "type": "message",
+    "message": {"type": "text", "text": "こんにちは"},
+    "webhookEventId": "test-event-id",
+}
+_IMAGE_EVENT = {
+    **_EVENT_BASE,
+    "type": "message",
+    "message": {"type": "image", "id": "test-image-id"},
+    "webhookEventId": "test-event-id-2",
+}
+_FOLLOW_EVENT = {
+    **_EVENT_BASE,
+    "type": "follow",
+    "webhookEventId": "test-event-id-3",
+}
+
+
+# Webhook bodies are constant, so encode them once at import
+_EVENT_BODIES = [
+    orjson.dumps({"events": [event], "destination": "test"})
+    for event in (_TEXT_EVENT, _IMAGE_EVENT, _FOLLOW_EVENT)
+]
+_WEBHOOK_HEADERS = {
+    "X-Line-Signature": "test-signature",
+    "Content-Type": "application/json",
+}
+
+
+@pytest.mark.parametrize("body", _EVENT_BODIES, ids=["text", "image", "follow"])
+def test_linebot_webhook_event_types(linebot_configured, client: TestClient,
+                                     body: bytes):
     """Test LINE Bot webhook with different event types."""
-    with patch.dict('os.environ', {
-        'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
-        'LINE_CHANNEL_SECRET': 'test-secret'
-    }):
-        # Test text message event
-        text_event = {
-            "type": "message",
-            "message": {"type": "text", "text": "こんにちは"},
-            "source": {"type": "user", "userId": "test-user"},
-            "timestamp": 1640995200000,
-            "mode": "active",
-            "webhookEventId": "test-event-id",
-            "deliveryContext": {"isRedelivery": False}
-        }
-        
-        # Test image message event
-        image_event = {
-            "type": "message",
-            "message": {"type": "image", "id": "test-image-id"},
-            "source": {"type": "user", "userId": "test-user"},
-            "timestamp": 1640995200000,
-            "mode": "active",
-            "webhookEventId": "test-event-id-2",
-            "deliveryContext": {"isRedelivery": False}
-        }
-        
-        # Test follow event
-        follow_event = {
-            "type": "follow",
-            "source": {"type": "user", "userId": "test-user"},
-            "timestamp": 1640995200000,
-            "mode": "active",
-            "webhookEventId": "test-event-id-3",
-            "deliveryContext": {"isRedelivery": False}
-        }
-        
-        events = [text_event, image_event, follow_event]
-        
-        for event in events:
-            webhook_body = {"events": [event], "destination": "test"}
-            
-            response = client.post(
-                "/api/v1/linebot/webhook",
-                json=webhook_body,
-                headers={"X-Line-Signature": "test-signature"}
-            )
-            
-            # Should reach webhook handler
-            assert response.status_code in [200, 400, 500]
\ No newline at end of file
+    response = client.post(
+        "/api/v1/linebot/webhook", content=body, headers=_WEBHOOK_HEADERS
+    )
+    
+    # Should reach webhook handler
+    assert response.status_code in [200, 400, 500]
+
+
+@pytest.mark.parametrize(
+    "text,command",
+    [
+        ("help", "help"),
+        ("HELP", "help"),
+        ("ヘルプ", "help"),
+        ("美容分析", "analysis"),
+        ("分析して", "analysis"),
+        ("相談したい", "chat"),
+        ("チャットで美容について相談したい", None),
+        ("こんにちは", None),
+    ],
+)
+def test_linebot_match_command(text: str, command: str | None):
+    """Test text commands match exactly or by keyword in short messages."""
+    from app.services.linebot_service import LineBotService
+
+    # Matching only reads class attributes; skip building real LINE API clients
+    service = LineBotService.__new__(LineBotService)
+    assert service._match_command(text) == command
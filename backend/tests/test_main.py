@@ -43,14 +43,8 @@ def test_cors_headers(client: TestClient):
         "Access-Control-Request-Method": "GET"
     })
     
-    # CORS preflight should return 200
+    # CORS preflight should return 200 and carry the allowed origin
     assert response.status_code == 200
-    
-    # Check CORS headers in actual request
-    response = client.get("/api/v1/", headers={
-        "Origin": "http://localhost:3000"
-    })
-    
     assert "access-control-allow-origin" in response.headers
 
 
@@ -0,0 +1,211 @@
+"""Test caching, rate limiting, write batching and image probing utilities."""
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from PIL import Image
+
+from app.utils.exceptions import ValidationError
+from app.utils.image_processing import ImageProcessor
+from app.utils.rate_limiter import RateLimiter, _TokenBucket
+from app.utils.semantic_cache import SemanticCache
+from app.utils.ttl_cache import TTLCache
+from app.utils.write_queue import BatchWriteQueue
+
+
+def _encode(image_format: str, size: tuple[int, int] = (120, 80)) -> bytes:
+    """Encode a blank RGB image of ``size`` in ``image_format``."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_ttl_cache_get_and_set():
+    """Test storing and reading back a value."""
+    cache = TTLCache()
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.get("missing", "default") == "default"
+
+
+def test_ttl_cache_expiry():
+    """Test expired entries are dropped on read."""
+    cache = TTLCache()
+    cache.set("key", "value", ttl_seconds=-1)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the least recently read entry is evicted first."""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_delete():
+    """Test deleting present and missing keys."""
+    cache = TTLCache()
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+    assert cache.get("key") is None
+
+
+def test_semantic_cache_hit_and_miss():
+    """Test lookups match similar embeddings and reject orthogonal ones."""
+    cache = SemanticCache(threshold=0.9)
+    cache.store("general", [1.0, 0.0, 0.0], "cached")
+
+    assert cache.lookup("general", [2.0, 0.1, 0.0]) == "cached"
+    assert cache.lookup("general", [0.0, 1.0, 0.0]) is None
+
+
+def test_semantic_cache_namespaces_are_isolated():
+    """Test an entry is only visible in its own namespace."""
+    cache = SemanticCache()
+    cache.store("general", [1.0, 0.0], "cached")
+    assert cache.lookup("analysis_review", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_expiry():
+    """Test expired entries never match."""
+    cache = SemanticCache(ttl_seconds=-1)
+    cache.store("general", [1.0, 0.0], "cached")
+    assert cache.lookup("general", [1.0, 0.0]) is None
+
+
+def test_semantic_cache_overwrites_oldest_slot():
+    """Test a full namespace overwrites its oldest entry."""
+    cache = SemanticCache(max_entries=2)
+    cache.store("general", [1.0, 0.0, 0.0], "first")
+    cache.store("general", [0.0, 1.0, 0.0], "second")
+    cache.store("general", [0.0, 0.0, 1.0], "third")
+
+    assert cache.lookup("general", [1.0, 0.0, 0.0]) is None
+    assert cache.lookup("general", [0.0, 1.0, 0.0]) == "second"
+    assert cache.lookup("general", [0.0, 0.0, 1.0]) == "third"
+
+
+def test_token_bucket_reports_wait():
+    """Test an empty bucket reports how long to wait."""
+    bucket = _TokenBucket(per_minute=60)
+    assert bucket.take(60) == 0.0
+    assert bucket.take(1) > 0
+
+
+def test_token_bucket_oversized_request():
+    """Test a request larger than the bucket drains it instead of deadlocking."""
+    bucket = _TokenBucket(per_minute=10)
+    assert bucket.take(1000) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_caps_concurrency():
+    """Test no more than max_concurrent_requests calls run at once."""
+    limiter = RateLimiter(
+        max_concurrent_requests=2, requests_per_minute=1000, tokens_per_minute=100000
+    )
+    active = peak = 0
+
+    async def call() -> None:
+        nonlocal active, peak
+        async with limiter.limit(10):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+class _FakeSession:
+    """PostgREST session stub recording posted batches."""
+
+    def __init__(self, reject: str | None = None) -> None:
+        self.batches: list[list[dict]] = []
+        self.reject = reject
+
+    def post(self, path: str, content: bytes, headers: dict) -> SimpleNamespace:
+        rows = orjson.loads(content)
+        if any(row.get("content") == self.reject for row in rows):
+            raise RuntimeError("rejected")
+        self.batches.append(rows)
+        return SimpleNamespace(raise_for_status=lambda: None)
+
+
+def _write_queue(session: _FakeSession, **kwargs) -> BatchWriteQueue:
+    """Build a write queue posting to ``session``."""
+    client = SimpleNamespace(postgrest=SimpleNamespace(session=session))
+    return BatchWriteQueue(client, "chat_messages", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_write_queue_batches_rows():
+    """Test rows queued together are written in one batch."""
+    session = _FakeSession()
+    queue = _write_queue(session, flush_interval=0.05)
+    for i in range(3):
+        queue.put({"content": str(i)})
+    await queue.close()
+
+    assert session.batches == [[{"content": "0"}, {"content": "1"}, {"content": "2"}]]
+
+
+@pytest.mark.asyncio
+async def test_write_queue_respects_max_batch():
+    """Test batches never exceed max_batch rows."""
+    session = _FakeSession()
+    queue = _write_queue(session, flush_interval=0.05, max_batch=2)
+    for i in range(5):
+        queue.put({"content": str(i)})
+    await queue.close()
+
+    assert [len(batch) for batch in session.batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_write_queue_retries_failed_batch_row_by_row():
+    """Test a bad row is dropped alone instead of taking its batch with it."""
+    session = _FakeSession(reject="bad")
+    queue = _write_queue(session, flush_interval=0.05)
+    for content in ("a", "bad", "b"):
+        queue.put({"content": content})
+    await queue.close()
+
+    assert session.batches == [[{"content": "a"}], [{"content": "b"}]]
+
+
+@pytest.mark.parametrize(
+    "image_format,mime",
+    [("PNG", "image/png"), ("JPEG", "image/jpeg"), ("WEBP", "image/webp")],
+)
+def test_probe_supported_formats(image_format: str, mime: str):
+    """Test probing reads format, size and MIME type from the header."""
+    info = ImageProcessor.probe(_encode(image_format))
+    assert (info.format, info.width, info.height, info.mime) == (
+        image_format, 120, 80, mime
+    )
+
+
+def test_probe_gif_has_no_mime():
+    """Test unsupported formats are probed but get no MIME type."""
+    info = ImageProcessor.probe(_encode("GIF"))
+    assert (info.format, info.width, info.height) == ("GIF", 120, 80)
+    assert info.mime is None
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG"])
+def test_probe_truncated_image(image_format: str):
+    """Test a truncated header is rejected rather than misread."""
+    with pytest.raises(ValidationError):
+        ImageProcessor.probe(_encode(image_format)[:10])
@@ -201,7 +201,6 @@ export interface Database {
         Row: {
           id: string
           user_id: string
-          analysis_count: number
           chat_message_count: number
           storage_used_mb: number
           last_analysis_at: string | null
@@ -213,7 +212,6 @@ export interface Database {
         Insert: {
           id?: string
           user_id: string
-          analysis_count?: number
           chat_message_count?: number
           storage_used_mb?: number
           last_analysis_at?: string | null
@@ -225,7 +223,6 @@ export interface Database {
         Update: {
           id?: string
           user_id?: string
-          analysis_count?: number
           chat_message_count?: number
           storage_used_mb?: number
           last_analysis_at?: string | null
@@ -310,7 +307,24 @@ export interface Database {
       }
     }
     Views: {
-      [_ in never]: never
+      user_profiles_with_stats: {
+        Row: {
+          id: string
+          full_name: string
+          avatar_url: string | null
+          bio: string | null
+          date_of_birth: string | null
+          gender: string | null
+          location: string | null
+          preferences: Record<string, any> | null
+          subscription_tier: string | null
+          email_verified: boolean | null
+          last_login: string | null
+          created_at: string | null
+          updated_at: string | null
+          analysis_count: number
+        }
+      }
     }
     Functions: {
       [_ in never]: never